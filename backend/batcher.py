@@ -0,0 +1,137 @@
+import asyncio
+import inspect
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+class MicroBatcher:
+    """
+    Gathers concurrent requests into one batch call.
+    The first queued request opens a window of `window_ms`; the batch is scored when
+    the window closes or `max_batch` requests are waiting, whichever comes first.
+    `process(items)` returns one result per item; an Exception instance in the result
+    list is raised to that item's caller only. A coroutine function is awaited on
+    the event loop; a plain function (CPU-bound scoring) runs in a worker thread,
+    so a batch never stalls the other endpoints of the app. Batches still run one
+    at a time.
+    With `max_queue`, at most that many items wait: submit() then blocks until
+    there is room, pushing back on callers instead of growing without bound.
+    """
+
+    def __init__(self, process, window_ms=2.0, max_batch=64, history=10_000, max_queue=0):
+        self.process = process
+        self._in_thread = not inspect.iscoroutinefunction(process)  # sees through functools.partial
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._task = None
+        # Metrics
+        self.batch_sizes = Counter()
+        self.queue_delays = deque(maxlen=history)  # seconds from submit to batch start
+        self.batch_times = deque(maxlen=history)  # seconds spent in process()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, drain=False):
+        """Stop the batching task; with `drain`, first process everything already queued"""
+        if drain and self._task is not None:
+            await self._queue.join()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            collected = await self._collect()
+            try:
+                await self._process(collected)
+            finally:
+                for _ in collected:
+                    self._queue.task_done()
+
+    async def _process(self, batch):
+        # Callers that gave up (client disconnects) are not scored
+        batch = [entry for entry in batch if not entry[1].cancelled()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        items = [item for item, _, _ in batch]
+        try:
+            if self._in_thread:
+                results = await asyncio.to_thread(self.process, items)
+            else:
+                results = self.process(items)
+            if inspect.isawaitable(results):
+                results = await results
+            results = list(results)
+        except Exception as e:  # a failing batch must not kill the loop
+            results = [e] * len(batch)
+        if len(results) < len(batch):
+            # Every caller must be answered: the ones without a result get an error
+            missing = RuntimeError(f"batch process returned {len(results)} results for {len(batch)} items")
+            results += [missing] * (len(batch) - len(results))
+        self.batch_times.append(time.perf_counter() - started)
+        self.batch_sizes[len(batch)] += 1
+        for (_, future, queued_at), result in zip(batch, results):
+            self.queue_delays.append(started - queued_at)
+            if future.cancelled():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        batches = sum(self.batch_sizes.values())
+        requests = sum(size * n for size, n in self.batch_sizes.items())
+        delays = np.asarray(self.queue_delays) * 1000
+        times = np.asarray(self.batch_times) * 1000
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch': self.max_batch,
+            'queued': self._queue.qsize(),
+            'batches': batches,
+            'requests': requests,
+            'mean_batch_size': round(requests / batches, 2) if batches else 0,
+            'batch_size_histogram': dict(sorted(self.batch_sizes.items())),
+            'queue_delay_ms': _percentiles(delays),
+            'batch_time_ms': _percentiles(times),
+        }
+
+def _percentiles(ms):
+    if not len(ms):
+        return {}
+    return {
+        'p50': round(float(np.percentile(ms, 50)), 3),
+        'p99': round(float(np.percentile(ms, 99)), 3),
+        'max': round(float(ms.max()), 3),
+    }
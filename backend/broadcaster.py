@@ -0,0 +1,74 @@
+import asyncio
+from dataclasses import dataclass, field
+
+@dataclass(eq=False)
+class Subscription:
+    """One live consumer: its equality filters and the queue of alerts waiting to be sent"""
+    filters: dict
+    queue: asyncio.Queue
+    dropped: bool = False  # fell too far behind; the stream ends and the client resumes by id
+    sent_up_to: int = 0  # highest alert id delivered, so catch-up and live events never repeat
+    _wake: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def matches(self, alert):
+        return all(alert.get(name) == value for name, value in self.filters.items())
+
+class AlertBroadcaster:
+    """
+    In-process fan-out of newly created alerts to live subscribers (GET /alerts/stream).
+    publish() runs on the event loop and never waits: every matching subscriber gets
+    the alerts on its own bounded queue. A subscriber whose queue is full is dropped
+    instead of slowing the writers down; its client reconnects with the last id it
+    saw and catches up from the table. Only this process's writes are seen, so with
+    several uvicorn workers a stream only carries the alerts its worker created.
+    """
+
+    def __init__(self, queue_size=1000):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self.published = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self, **filters):
+        sub = Subscription({k: v for k, v in filters.items() if v is not None}, asyncio.Queue(self.queue_size))
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        self._subscribers.discard(sub)
+
+    def publish(self, alerts):
+        """Hand freshly committed alerts (dicts with id and created_at) to every matching subscriber"""
+        self.published += len(alerts)
+        for sub in list(self._subscribers):
+            for alert in alerts:
+                if not sub.matches(alert):
+                    continue
+                try:
+                    sub.queue.put_nowait(alert)
+                except asyncio.QueueFull:
+                    sub.dropped = True
+                    sub._wake.set()
+                    self._subscribers.discard(sub)
+                    self.dropped += 1
+                    break
+
+    async def next_alert(self, sub, timeout):
+        """The subscriber's next live alert, or None after `timeout` seconds or once it was dropped"""
+        if sub.dropped and sub.queue.empty():
+            return None
+        get = asyncio.ensure_future(sub.queue.get())
+        wake = asyncio.ensure_future(sub._wake.wait())
+        try:
+            await asyncio.wait({get, wake}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            wake.cancel()
+            if not get.done():
+                get.cancel()
+        return get.result() if get.done() and not get.cancelled() else None
+
+    def stats(self):
+        return {'subscribers': len(self), 'published': self.published, 'dropped': self.dropped}
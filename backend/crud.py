@@ -1,18 +1,192 @@
+import asyncio
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
+from sqlalchemy import String, insert, select, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from . import models
+from .database import engine
 
-def create_alert(db: Session, alert_data):
-    a = models.Alert(
+# Client-settable alert columns (id and created_at are assigned by the database)
+ALERT_FIELDS = ("type", "location", "priority", "details", "status")
+
+def alert_row(alert_data):
+    return dict(
         type=alert_data.get("type"),
         location=alert_data.get("location"),
         priority=alert_data.get("priority"),
         details=alert_data.get("details"),
-        status=alert_data.get("status", "Active")
+        status=alert_data.get("status") or "Active"  # missing or null: a new alert is active
     )
+
+# Columns GET /alerts filters on by equality (each has a matching index in models.py)
+ALERT_FILTERS = ("type", "priority", "status", "location")
+# created_at as SQLite stores it ('YYYY-MM-DD HH:MM:SS' text from CURRENT_TIMESTAMP).
+# Cursors and time bounds compare against this raw text: a datetime parameter would
+# be rendered with microseconds and never equal a stored value.
+_CREATED_AT_TEXT = type_coerce(models.Alert.created_at, String)
+
+def list_alerts(db: Session, limit: int = 100):
+    return db.query(models.Alert).order_by(models.Alert.created_at.desc()).limit(limit).all()
+
+# SQLite has one write lock per file. Every alert write of this process runs on one
+# writer thread over one long-lived connection, in submission order:
+# - writers never collide on the lock and back off in SQLite's busy handler
+#   (sleeps of up to 100 ms each), which is what makes write tail latency explode;
+# - a write is a single hop off the event loop: its INSERT and COMMIT do not each
+#   wait for a busy loop to pick up the result, as they do through aiosqlite;
+# - alerts are committed, and handed to `publish`, in id order.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-writer")
+_writer_conn = None  # opened and used on the writer thread only
+# Held by every alert write from its INSERT until its alerts are queued for `publish`,
+# by the writer thread and by the blocking create_alert alike: whichever path wrote
+# them, alerts reach `publish` in id order (a stream drops ids below one it has sent).
+_commit_order = threading.Lock()
+
+def create_alert(db: Session, alert_data, publish=None, loop=None):
+    """
+    The blocking write POST /alerts/sync keeps as the baseline of
+    scripts/bench_alerts.py: one session, one transaction per alert, on the
+    request's worker thread. `publish(alerts)` is queued on `loop` as by the writer.
+    """
+    a = models.Alert(**alert_row(alert_data))
     db.add(a)
-    db.commit()
-    db.refresh(a)
+    with _commit_order:
+        db.commit()
+        db.refresh(a)
+        if publish is not None:
+            loop.call_soon_threadsafe(publish, [dict(alert_row(alert_data), id=a.id, created_at=a.created_at)])
     return a
 
-def list_alerts(db: Session, limit: int = 100):
-    return db.query(models.Alert).order_by(models.Alert.created_at.desc()).limit(limit).all()
\ No newline at end of file
+def _insert_alerts(rows, batch_size, publish, loop):
+    """Writer thread: insert and commit `rows`, then queue `publish(alerts)` on the event loop"""
+    global _writer_conn
+    if _writer_conn is None:
+        _writer_conn = engine.connect()
+    stmt = (insert(models.Alert)
+            .returning(models.Alert.id, models.Alert.created_at, sort_by_parameter_order=True)
+            .execution_options(insertmanyvalues_page_size=batch_size))
+    with _commit_order:
+        with _writer_conn.begin():
+            result = _writer_conn.execute(stmt, rows)
+            alerts = [dict(row, id=alert_id, created_at=created_at) for row, (alert_id, created_at) in zip(rows, result)]
+        if publish is not None:
+            # Callbacks run in the order they were queued, i.e. in commit order, and
+            # before the writer's caller resumes
+            loop.call_soon_threadsafe(publish, alerts)
+    return alerts
+
+def _close_writer():
+    global _writer_conn
+    if _writer_conn is not None:
+        _writer_conn.close()
+        _writer_conn = None
+
+async def close_writer():
+    """Close the writer connection (app shutdown); the next write reopens it"""
+    await asyncio.get_running_loop().run_in_executor(_writer, _close_writer)
+
+async def create_alert_async(alert_data, publish=None):
+    """
+    Insert one alert on the writer thread and return it as a dict with id and
+    created_at. `publish(alerts)` receives the committed alert, in id order with
+    every other write of this process.
+    """
+    return (await create_alerts_bulk_async([alert_row(alert_data)], batch_size=1, publish=publish))[0]
+
+def validate_alerts(items):
+    """
+    Check a whole batch before anything is written. Returns (rows, errors): one
+    insert row per item, and (index, message) for every item that is not an
+    object or has a non-string field. Unknown keys are ignored, like POST /alerts.
+    """
+    rows, errors = [], []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append((i, "alert must be a JSON object"))
+            continue
+        bad = [f for f in ALERT_FIELDS if item.get(f) is not None and not isinstance(item[f], str)]
+        if bad:
+            errors.append((i, f"must be strings: {', '.join(bad)}"))
+            continue
+        rows.append(alert_row(item))
+    return rows, errors
+
+async def create_alerts_bulk_async(rows, batch_size=500, publish=None):
+    """
+    Insert validated rows in one transaction (one commit) on the writer
+    thread and return the stored alerts (the rows plus id and created_at) in input
+    order. SQLAlchemy sends the executemany as multi-row INSERT ... RETURNING
+    statements of `batch_size` rows each. `publish` as in create_alert_async.
+    """
+    if not rows:
+        return []
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_writer, _insert_alerts, rows, batch_size, publish, loop)
+
+async def write_alert_group(rows, publish=None):
+    """
+    Group commit for the write-behind buffer (main.py, ALERT_GROUP_COMMIT): every
+    alert queued during one flush window is inserted in one transaction, so they
+    share a single commit. Returns the stored alerts in queue order.
+    Committed means what it means for every write on this engine (database.py,
+    WAL with synchronous=NORMAL): a crash of the process loses nothing, a power
+    loss can lose the last commits before the next checkpoint.
+    """
+    return await create_alerts_bulk_async(rows, batch_size=len(rows), publish=publish)
+
+async def list_alerts_after(db: AsyncSession, last_id: int, limit: int = 1000, **filters):
+    """Alerts with id > last_id, oldest first: what a reconnecting /alerts/stream client missed"""
+    columns = models.Alert.__table__.columns
+    stmt = select(*columns).where(models.Alert.id > last_id)
+    for name, value in filters.items():
+        if value is not None:
+            stmt = stmt.where(columns[name] == value)
+    return (await db.execute(stmt.order_by(models.Alert.id).limit(limit))).all()
+
+def encode_cursor(created_at, alert_id):
+    return base64.urlsafe_b64encode(f"{created_at}|{alert_id}".encode()).decode()
+
+def decode_cursor(cursor):
+    """(created_at text, id) of the last alert of the previous page; ValueError if malformed"""
+    try:
+        created_at, alert_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return created_at, int(alert_id)
+    except (UnicodeError, ValueError):  # binascii.Error is a ValueError
+        raise ValueError(f"invalid cursor {cursor!r}")
+
+def _db_time(dt):
+    """A datetime in created_at's stored form (UTC, second resolution); naive values are taken as UTC"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+async def list_alerts_async(db: AsyncSession, limit: int = 100, cursor=None, since=None, until=None, **filters):
+    """
+    One page of alerts, newest first, and the cursor of the next page (None on the
+    last one). Keyset pagination: the next page starts strictly after the
+    (created_at, id) of this page's last row, so page N is an index seek like page 1
+    instead of an OFFSET scan. `filters` are equality filters from ALERT_FILTERS;
+    `since` (inclusive) and `until` (exclusive) bound created_at.
+    """
+    columns = models.Alert.__table__.columns
+    # Plain rows instead of ORM objects: a read-only listing needs no identity map
+    stmt = select(*columns, _CREATED_AT_TEXT.label("cursor_created_at"))
+    for name, value in filters.items():
+        if value is not None:
+            stmt = stmt.where(columns[name] == value)
+    if since is not None:
+        stmt = stmt.where(_CREATED_AT_TEXT >= _db_time(since))
+    if until is not None:
+        stmt = stmt.where(_CREATED_AT_TEXT < _db_time(until))
+    if cursor:
+        stmt = stmt.where(tuple_(_CREATED_AT_TEXT, models.Alert.id) < tuple_(*decode_cursor(cursor)))
+    # One extra row tells whether another page exists
+    stmt = stmt.order_by(models.Alert.created_at.desc(), models.Alert.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].cursor_created_at, rows[-1].id)
\ No newline at end of file
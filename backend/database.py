@@ -1,9 +1,35 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///./backend.db"
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./backend.db")
+# Same file through aiosqlite: every connection runs in its own thread, the event loop never blocks on SQLite
+# (needs `pip install aiosqlite "sqlalchemy[asyncio]"`)
+ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+# Connections kept open per process. With WAL, readers never wait for the writer,
+# so a handful of pooled connections serves concurrent reads; writes still take
+# turns on SQLite's single write lock (busy_timeout makes them queue, not fail).
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '8'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '8'))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', '5000'))
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")  # durable at every checkpoint; WAL commits skip the fsync
+    cursor.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    cursor.close()
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+event.listen(engine, "connect", _sqlite_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+# expire_on_commit=False: returned rows stay readable after commit without another query
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
@@ -1,10 +1,91 @@
-from fastapi import FastAPI, Depends
+import os
+import json
+import asyncio
+import functools
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .database import SessionLocal, engine, Base
+from .database import AsyncSessionLocal, SessionLocal, async_engine, engine, Base
 from . import models, crud
+from .predictor import ModelWatcher, PredictRequest, UnknownMuleError, registry
+from .batcher import MicroBatcher
+from .broadcaster import AlertBroadcaster
+from .mule_state import CRIME_DB_PATH, ComplaintCreate, MuleStateStore, insert_complaint
+
+# Micro-batching of /predict: wait up to WINDOW_MS for up to MAX_BATCH requests.
+# WINDOW_MS=0 never waits and only batches what queued up during the previous batch; MAX_BATCH=1 disables.
+PREDICT_BATCH_WINDOW_MS = float(os.environ.get('PREDICT_BATCH_WINDOW_MS', '1'))
+PREDICT_MAX_BATCH = int(os.environ.get('PREDICT_MAX_BATCH', '64'))
+# How often the model registry is checked for a newly published version
+MODEL_POLL_SECONDS = float(os.environ.get('MODEL_POLL_SECONDS', '2'))
+# Mules whose latest withdrawal is kept in memory; colder ones are spilled to SQLite
+MULE_STATE_CAPACITY = int(os.environ.get('MULE_STATE_CAPACITY', '100000'))
+# How stale a mule lookup may be about complaints posted through another worker
+MULE_STATE_REFRESH_MS = float(os.environ.get('MULE_STATE_REFRESH_MS', '50'))
+# POST /alerts/bulk: rows per multi-row INSERT statement (all batches share one transaction)
+ALERT_BULK_BATCH_SIZE = int(os.environ.get('ALERT_BULK_BATCH_SIZE', '500'))
+# Optional group commit for POST /alerts: alerts are buffered and written together every
+# FLUSH_MS or FLUSH_MAX alerts; a request returns once its alert is committed (with the
+# same synchronous=NORMAL guarantee as every other write). At most QUEUE alerts wait,
+# further requests block until the writer catches up.
+ALERT_GROUP_COMMIT = os.environ.get('ALERT_GROUP_COMMIT', '0') == '1'
+ALERT_GROUP_COMMIT_FLUSH_MS = float(os.environ.get('ALERT_GROUP_COMMIT_FLUSH_MS', '5'))
+ALERT_GROUP_COMMIT_FLUSH_MAX = int(os.environ.get('ALERT_GROUP_COMMIT_FLUSH_MAX', '256'))
+ALERT_GROUP_COMMIT_QUEUE = int(os.environ.get('ALERT_GROUP_COMMIT_QUEUE', '10000'))
+# GET /alerts/stream: live alerts a subscriber may fall behind by before it is dropped
+# (it then resumes by id), keep-alive comment interval, and rows per catch-up query
+ALERT_STREAM_QUEUE = int(os.environ.get('ALERT_STREAM_QUEUE', '1000'))
+ALERT_STREAM_HEARTBEAT_SECONDS = float(os.environ.get('ALERT_STREAM_HEARTBEAT_SECONDS', '15'))
+ALERT_STREAM_CATCHUP_PAGE = int(os.environ.get('ALERT_STREAM_CATCHUP_PAGE', '1000'))
 
 Base.metadata.create_all(bind=engine)
-app = FastAPI(title="I4C Backend Alerts")
+# create_all skips tables that already exist: add indexes introduced since the table was created
+for index in models.Alert.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model once per process, not per request; newer registry versions are
+    # loaded in the background and swapped in between batches
+    watcher = app.state.models = ModelWatcher(poll_s=MODEL_POLL_SECONDS)
+    watcher.load_initial()
+    # Each batch resolves watcher.predictor once, so it is scored by one model version
+    app.state.batcher = MicroBatcher(lambda reqs: watcher.predictor.predict_batch(reqs),
+                                     window_ms=PREDICT_BATCH_WINDOW_MS, max_batch=PREDICT_MAX_BATCH)
+    app.state.batcher.start()
+    watcher.start()
+    # Latest withdrawal per mule, for predictions that only name the mule
+    app.state.mules = MuleStateStore(capacity=MULE_STATE_CAPACITY, refresh_s=MULE_STATE_REFRESH_MS / 1000)
+    if os.path.exists(CRIME_DB_PATH):
+        app.state.mules.warm_start()
+    # Every committed alert is pushed to the /alerts/stream subscribers of this process
+    app.state.alert_feed = AlertBroadcaster(queue_size=ALERT_STREAM_QUEUE)
+    app.state.loop = asyncio.get_running_loop()  # where the blocking handlers queue their publishes
+    # Write-behind buffer for POST /alerts (None: every request commits on its own)
+    app.state.alert_writer = None
+    if ALERT_GROUP_COMMIT:
+        app.state.alert_writer = MicroBatcher(functools.partial(crud.write_alert_group, publish=app.state.alert_feed.publish),
+                                              window_ms=ALERT_GROUP_COMMIT_FLUSH_MS,
+                                              max_batch=ALERT_GROUP_COMMIT_FLUSH_MAX,
+                                              max_queue=ALERT_GROUP_COMMIT_QUEUE)
+        app.state.alert_writer.start()
+    yield
+    if app.state.alert_writer is not None:
+        await app.state.alert_writer.stop(drain=True)  # accepted alerts are written before exit
+    await watcher.stop()
+    await app.state.batcher.stop()
+    app.state.mules.close()
+    await crud.close_writer()
+    await async_engine.dispose()
+
+app = FastAPI(title="I4C Backend Alerts", lifespan=lifespan)
 
 def get_db():
     db = SessionLocal()
@@ -13,12 +94,217 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def alert_dict(r):
+    return {"id": r.id, "type": r.type, "location": r.location, "priority": r.priority, "details": r.details, "status": r.status, "created_at": r.created_at}
+
+# async: writes go to crud's single writer thread, reads run on aiosqlite's connection threads
 @app.post("/alerts")
-def create_alert(alert: dict, db: Session = Depends(get_db)):
-    a = crud.create_alert(db, alert)
-    return {"id": a.id, "status": "created"}
+async def create_alert(alert: dict):
+    if app.state.alert_writer is not None:
+        # Group commit: resolves when the flush holding this alert has committed
+        stored = await app.state.alert_writer.submit(crud.alert_row(alert))
+        return {"id": stored["id"], "status": "created"}
+    stored = await crud.create_alert_async(alert, publish=app.state.alert_feed.publish)
+    return {"id": stored["id"], "status": "created"}
+
+@app.get("/alerts/stats")
+def alert_writer_stats():
+    """Flush sizes and queueing delay of the POST /alerts group commit (when enabled), and stream fan-out"""
+    writer = app.state.alert_writer
+    stats = {"group_commit": False} if writer is None else dict(writer.stats(), group_commit=True)
+    stats["stream"] = app.state.alert_feed.stats()
+    return stats
+
+def sse_event(alert):
+    return f"id: {alert['id']}\nevent: alert\ndata: {json.dumps(jsonable_encoder(alert))}\n\n"
+
+@app.get("/alerts/stream")
+async def stream_alerts(alert_type: Optional[str] = Query(None, alias="type"),
+                        priority: Optional[str] = None,
+                        status: Optional[str] = None,
+                        location: Optional[str] = None,
+                        last_id: Optional[int] = None,
+                        last_event_id: Optional[int] = Header(None)):
+    """
+    Server-Sent Events feed of new alerts, pushed as they are committed (one `alert`
+    event per alert, `id:` = alert id). Filters are equality filters like GET /alerts.
+    To resume, pass `last_id` (or let EventSource send Last-Event-ID on reconnect):
+    alerts after it are replayed from the table first, then the live feed continues
+    with no gap and no repeats. A client that falls too far behind is disconnected
+    and resumes the same way.
+    """
+    filters = dict(type=alert_type, priority=priority, status=status, location=location)
+    resume_from = last_event_id if last_event_id is not None else last_id
+    feed = app.state.alert_feed
+    # Subscribe before reading the backlog, so alerts committed in between are queued, not lost
+    sub = feed.subscribe(**filters)
+
+    async def events():
+        try:
+            yield "retry: 1000\n\n"
+            if resume_from is not None:
+                sub.sent_up_to = resume_from
+                while True:
+                    async with AsyncSessionLocal() as db:
+                        missed = await crud.list_alerts_after(db, sub.sent_up_to, ALERT_STREAM_CATCHUP_PAGE, **filters)
+                    for r in missed:
+                        sub.sent_up_to = r.id
+                        yield sse_event(alert_dict(r))
+                    if len(missed) < ALERT_STREAM_CATCHUP_PAGE:
+                        break
+            while True:
+                alert = await feed.next_alert(sub, ALERT_STREAM_HEARTBEAT_SECONDS)
+                if alert is None:
+                    if sub.dropped:
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if alert["id"] <= sub.sent_up_to:  # already replayed from the table
+                    continue
+                sub.sent_up_to = alert["id"]
+                yield sse_event(alert)
+        finally:
+            feed.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.get("/alerts")
-def get_alerts(db: Session = Depends(get_db)):
+async def get_alerts(response: Response,
+                     limit: int = Query(100, ge=1, le=1000),
+                     cursor: Optional[str] = None,
+                     alert_type: Optional[str] = Query(None, alias="type"),
+                     priority: Optional[str] = None,
+                     status: Optional[str] = None,
+                     location: Optional[str] = None,
+                     since: Optional[datetime] = None,
+                     until: Optional[datetime] = None,
+                     db: AsyncSession = Depends(get_async_db)):
+    """
+    Newest alerts first, `limit` per page. The body stays a plain list; when there
+    are more alerts, the X-Next-Cursor header holds the `cursor` for the next page.
+    """
+    try:
+        res, next_cursor = await crud.list_alerts_async(db, limit, cursor, since, until, type=alert_type,
+                                                        priority=priority, status=status, location=location)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [alert_dict(r) for r in res]
+
+def parse_alert_batch(body: bytes, content_type: str):
+    """
+    NDJSON (one alert object per line, blank lines skipped) if the content type
+    says so, otherwise any JSON value: the caller checks that it is an array.
+    """
+    text = body.decode("utf-8")
+    if "ndjson" not in content_type:
+        return json.loads(text)
+    items = []
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if line.strip():
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {line_no}: {e.msg}")
+    return items
+
+@app.post("/alerts/bulk")
+async def create_alerts_bulk(request: Request, batch_size: int = ALERT_BULK_BATCH_SIZE):
+    """
+    Many alerts in one request and one transaction: a JSON array, or NDJSON with
+    Content-Type application/x-ndjson. The whole batch is validated first and
+    rejected (422, with every bad index) if any alert is invalid. Returns the
+    new ids in input order.
+    """
+    started = time.perf_counter()
+    try:
+        items = parse_alert_batch(await request.body(), request.headers.get("content-type", ""))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Malformed alert batch: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Expected a JSON array of alerts "
+                                                    "(send NDJSON with Content-Type application/x-ndjson)")
+    rows, errors = crud.validate_alerts(items)
+    if errors:
+        raise HTTPException(status_code=422, detail=[{"index": i, "error": msg} for i, msg in errors[:100]])
+    stored = await crud.create_alerts_bulk_async(rows, batch_size=max(1, batch_size),
+                                                 publish=app.state.alert_feed.publish)
+    ids = [alert["id"] for alert in stored]
+    elapsed = time.perf_counter() - started
+    return {
+        "ids": ids,
+        "count": len(ids),
+        "status": "created",
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "alerts_per_second": round(len(ids) / elapsed, 1) if elapsed > 0 else None,
+    }
+
+# The previous blocking handlers, kept for scripts/bench_alerts.py to compare against
+@app.post("/alerts/sync", include_in_schema=False)
+def create_alert_sync(alert: dict, db: Session = Depends(get_db)):
+    # Commits on this worker thread; crud orders it with the writer thread's commits,
+    # so alerts from both routes are published in one id order
+    a = crud.create_alert(db, alert, publish=app.state.alert_feed.publish, loop=app.state.loop)
+    return {"id": a.id, "status": "created"}
+
+@app.get("/alerts/sync", include_in_schema=False)
+def get_alerts_sync(db: Session = Depends(get_db)):
     res = crud.list_alerts(db)
-    return [{"id": r.id, "type": r.type, "location": r.location, "priority": r.priority, "details": r.details, "status": r.status, "created_at": r.created_at} for r in res]
\ No newline at end of file
+    return [alert_dict(r) for r in res]
+
+# async: requests are queued to the micro-batcher, which scores each batch in a worker thread
+@app.post("/predict")
+async def predict_next_location(req: PredictRequest):
+    if app.state.models.predictor is None:
+        raise HTTPException(status_code=503, detail="Model not trained yet: run backend/scripts/train_model.py")
+    started = time.perf_counter()
+    try:
+        result = await app.state.batcher.submit(req)
+    except UnknownMuleError:
+        # Only models trained before the unknown-mule bucket reject new mules
+        raise HTTPException(status_code=404, detail=f"Unknown mule account: {req.mule_id}")
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 3)  # queueing + scoring
+    return result
+
+@app.post("/complaints")
+def create_complaint(complaint: ComplaintCreate):
+    row_id, _ = insert_complaint(complaint.model_dump())
+    # Applies this complaint, and any that another worker inserted before it, in id order
+    app.state.mules.catch_up()
+    return {"id": row_id, "status": "created"}
+
+@app.get("/mules/stats")
+def mule_state_stats():
+    mules = app.state.mules
+    return dict(mules.stats, in_memory=len(mules), capacity=mules.capacity, watermark=mules.watermark)
+
+@app.get("/mules/{mule_id}/next")
+async def predict_from_last_withdrawal(mule_id: str, k: int = 3):
+    """Next location from the mule's latest known withdrawal (no coordinates needed from the caller)"""
+    state = await run_in_threadpool(app.state.mules.get, mule_id)  # may read SQLite
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"No withdrawals recorded for mule account: {mule_id}")
+    req = PredictRequest(mule_id=mule_id, lat=state.lat, long=state.long,
+                         timestamp=state.timestamp, k=max(1, min(k, 10)))
+    result = await predict_next_location(req)
+    result["last_withdrawal"] = {"lat": state.lat, "long": state.long, "timestamp": state.timestamp}
+    return result
+
+@app.get("/predict/stats")
+def prediction_stats():
+    """Batch-size distribution and queueing delay of the /predict micro-batcher"""
+    return app.state.batcher.stats()
+
+@app.get("/model")
+def model_info():
+    """Registry metadata of the model being served"""
+    watcher = app.state.models
+    if watcher.version is None:
+        return {"version": None, "loaded": watcher.predictor is not None}
+    return dict(registry.load_metadata(watcher.version, watcher.root), swaps=watcher.swaps)
@@ -1,13 +1,27 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Index, Integer, String, DateTime, Text
 from sqlalchemy.sql import func
 from .database import Base
 
 class Alert(Base):
     __tablename__ = "alerts"
     id = Column(Integer, primary_key=True, index=True)
-    type = Column(String, index=True)
+    type = Column(String)
     location = Column(String)
     priority = Column(String)
     details = Column(Text)
     status = Column(String, default="Active")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # GET /alerts pages newest first on (created_at, id). Every filterable column
+    # leads its own copy of that order, so a filtered page is one index range scan
+    # that starts at the cursor, whatever page it is.
+    # created_at is read back by the INSERT itself (RETURNING), so a new alert can be
+    # published to /alerts/stream without another query
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_alerts_created_at_id", "created_at", "id"),
+        Index("ix_alerts_type_created_at_id", "type", "created_at", "id"),
+        Index("ix_alerts_priority_created_at_id", "priority", "created_at", "id"),
+        Index("ix_alerts_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_alerts_location_created_at_id", "location", "created_at", "id"),
+    )
\ No newline at end of file
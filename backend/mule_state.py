@@ -0,0 +1,297 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CRIME_DB_PATH = os.path.join(DATA_DIR, 'crime_data.db')
+STATE_DB_PATH = os.path.join(DATA_DIR, 'mule_state.db')
+
+SQL_CREATE_STATE = """
+    CREATE TABLE IF NOT EXISTS mule_state (
+        mule_id TEXT PRIMARY KEY,
+        lat REAL,
+        long REAL,
+        hour INTEGER,
+        day_of_week INTEGER,
+        timestamp TEXT,
+        complaint_id INTEGER
+    ) WITHOUT ROWID
+"""
+SQL_CREATE_META = "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)"
+# Only ever moves a mule forward in time, so a late spill of an older state is harmless
+SQL_UPSERT_STATE = """
+    INSERT INTO mule_state (mule_id, lat, long, hour, day_of_week, timestamp, complaint_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (mule_id) DO UPDATE SET
+        lat = excluded.lat, long = excluded.long, hour = excluded.hour,
+        day_of_week = excluded.day_of_week, timestamp = excluded.timestamp,
+        complaint_id = excluded.complaint_id
+    WHERE (excluded.timestamp, excluded.complaint_id) > (mule_state.timestamp, mule_state.complaint_id)
+"""
+# Complaints without a mule, a time or coordinates say nothing about where a mule is
+SQL_USABLE_COMPLAINT = (
+    "mule_account_id IS NOT NULL AND timestamp IS NOT NULL "
+    "AND withdrawal_lat IS NOT NULL AND withdrawal_long IS NOT NULL"
+)
+# Latest withdrawal of every mule, same ordering as the training pairs (timestamp, then id)
+SQL_LATEST_PER_MULE = f"""
+    SELECT mule_account_id, withdrawal_lat, withdrawal_long, timestamp, id FROM (
+        SELECT mule_account_id, withdrawal_lat, withdrawal_long, timestamp, id,
+               ROW_NUMBER() OVER (PARTITION BY mule_account_id ORDER BY timestamp DESC, id DESC) AS rn
+        FROM complaints WHERE {SQL_USABLE_COMPLAINT}
+    ) WHERE rn = 1
+"""
+# Complaints inserted after a watermark, by any process, in commit (id) order
+SQL_COMPLAINTS_AFTER = f"""
+    SELECT mule_account_id, withdrawal_lat, withdrawal_long, timestamp, id FROM complaints
+    WHERE id > ? AND {SQL_USABLE_COMPLAINT} ORDER BY id
+"""
+# Several processes flush to the same table: the watermark only moves forward
+SQL_SAVE_WATERMARK = """
+    INSERT INTO meta (key, value) VALUES ('watermark', ?)
+    ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)
+"""
+SQL_INSERT_COMPLAINT = """
+    INSERT INTO complaints (complaint_id, fraud_type, amount, mule_account_id, withdrawal_atm_id,
+                            withdrawal_lat, withdrawal_long, location_name, timestamp, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+@dataclass
+class MuleState:
+    """Everything the next-location model needs about a mule's latest withdrawal"""
+    mule_id: str
+    lat: float
+    long: float
+    hour: int
+    day_of_week: int
+    timestamp: str
+    complaint_id: int
+
+    @classmethod
+    def from_withdrawal(cls, mule_id, lat, long, timestamp, complaint_id):
+        ts = datetime.fromisoformat(str(timestamp))
+        return cls(mule_id, float(lat), float(long), ts.hour, ts.weekday(),
+                   ts.strftime('%Y-%m-%d %H:%M:%S'), int(complaint_id))
+
+    def as_row(self):
+        return (self.mule_id, self.lat, self.long, self.hour, self.day_of_week, self.timestamp, self.complaint_id)
+
+    def newer_than(self, other):
+        return (self.timestamp, self.complaint_id) > (other.timestamp, other.complaint_id)
+
+class MuleStateStore:
+    """
+    Latest withdrawal per mule for online feature construction.
+    The `capacity` most recently used mules live in an LRU dict (O(1) get and
+    update); colder mules are evicted to the mule_state table in SQLite, written
+    in batches, and promoted back on their next lookup. On shutdown everything is
+    spilled together with the complaint id watermark, so the next boot only
+    replays complaints inserted after it.
+
+    The complaints table is the source of truth. Every get() first applies the
+    complaints inserted since the watermark, so with several server workers (one
+    store per process) a worker also sees complaints posted to the others. The
+    spill table can be shared by those workers: spilled states and the
+    watermark only ever move forward. get() checks for new complaints at most
+    every `refresh_s` seconds, and a check reads PRAGMA data_version (a counter
+    that moves only when another connection commits) before any table, so most
+    lookups are a dict access and never touch SQLite. Complaints posted through
+    another worker show up within `refresh_s`; call catch_up() to apply them now.
+    """
+
+    def __init__(self, capacity=100_000, db_path=STATE_DB_PATH, spill_batch=256, crime_db_path=CRIME_DB_PATH,
+                 refresh_s=0.05):
+        self.capacity = capacity
+        self.refresh_s = refresh_s
+        self.db_path = db_path
+        self.crime_db_path = crime_db_path
+        self.spill_batch = spill_batch
+        self._hot = OrderedDict()
+        self._evicted = {}  # evicted but not yet written to SQLite
+        self._lock = threading.Lock()
+        self._catch_up_lock = threading.Lock()
+        self._source = None  # read connection to complaints, opened on first catch-up
+        self._source_version = None  # its PRAGMA data_version at the last catch-up
+        self._checked_at = float('-inf')  # time.monotonic() of the last catch-up
+        self.watermark = 0  # every complaints.id up to here has been applied
+        self.stats = {'hits': 0, 'spill_hits': 0, 'misses': 0, 'evictions': 0, 'skipped': 0}
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(SQL_CREATE_STATE)
+        self.conn.execute(SQL_CREATE_META)
+        self.conn.commit()
+
+    def __len__(self):
+        return len(self._hot)
+
+    def get(self, mule_id):
+        """Latest state of a mule, or None if it has never withdrawn (blocking: SQLite reads)"""
+        if time.monotonic() - self._checked_at >= self.refresh_s:
+            self.catch_up()
+        with self._lock:
+            state = self._hot.get(mule_id)
+            if state is not None:
+                self._hot.move_to_end(mule_id)
+                self.stats['hits'] += 1
+                return state
+            state = self._evicted.pop(mule_id, None) or self._load_spilled(mule_id)
+            if state is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['spill_hits'] += 1
+            self._put(state)
+            return state
+
+    def observe(self, mule_id, lat, long, timestamp, complaint_id):
+        """Apply one withdrawal; older-than-known withdrawals are ignored. Does not move the watermark."""
+        state = MuleState.from_withdrawal(mule_id, lat, long, timestamp, complaint_id)
+        with self._lock:
+            current = self._hot.get(mule_id) or self._evicted.pop(mule_id, None) or self._load_spilled(mule_id)
+            if current is None or state.newer_than(current):
+                self._put(state)
+            else:
+                self._put(current)
+        return state
+
+    def catch_up(self):
+        """
+        Apply every complaint inserted after the watermark, by any process; returns
+        how many. A row that cannot be parsed is counted in stats['skipped'] and
+        passed over: the watermark still moves past it.
+        """
+        if not os.path.exists(self.crime_db_path):
+            return 0
+        with self._catch_up_lock:
+            if self._source is None:
+                self._source = sqlite3.connect(self.crime_db_path, check_same_thread=False)
+            self._checked_at = time.monotonic()
+            # Changes whenever another connection commits to the file, and only then
+            version = self._source.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._source_version:
+                return 0
+            rows = self._source.execute(SQL_COMPLAINTS_AFTER, (self.watermark,)).fetchall()
+            for row in rows:
+                try:
+                    self.observe(*row)
+                except ValueError:  # e.g. a timestamp that is not ISO 8601
+                    self.stats['skipped'] += 1
+            if rows:
+                self.watermark = rows[-1][4]
+            self._source_version = version
+        return len(rows)
+
+    def _put(self, state):
+        self._hot[state.mule_id] = state
+        self._hot.move_to_end(state.mule_id)
+        while len(self._hot) > self.capacity:
+            _, cold = self._hot.popitem(last=False)
+            self._evicted[cold.mule_id] = cold
+            self.stats['evictions'] += 1
+        if len(self._evicted) >= self.spill_batch:
+            self._spill(list(self._evicted.values()))
+            self._evicted.clear()
+
+    def _load_spilled(self, mule_id):
+        row = self.conn.execute(
+            "SELECT mule_id, lat, long, hour, day_of_week, timestamp, complaint_id FROM mule_state WHERE mule_id = ?",
+            (mule_id,)
+        ).fetchone()
+        return MuleState(*row) if row else None
+
+    def _spill(self, states):
+        with self.conn:
+            self.conn.executemany(SQL_UPSERT_STATE, [s.as_row() for s in states])
+
+    def flush(self):
+        """Write every in-memory state and the watermark to SQLite (call on shutdown)"""
+        with self._lock:
+            self._spill(list(self._evicted.values()) + list(self._hot.values()))
+            self._evicted.clear()
+            with self.conn:
+                self.conn.execute(SQL_SAVE_WATERMARK, (self.watermark,))
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+        if self._source is not None:
+            self._source.close()
+
+    def warm_start(self, crime_db_path=None):
+        """
+        Boot-time load. From the spill table if a previous process left one (then
+        only complaints above its watermark are replayed), otherwise one pass of
+        the latest withdrawal per mule over `complaints`. Either way the
+        `capacity` most recent mules end up in memory and the rest in SQLite.
+        Returns the number of mules held in memory.
+        """
+        if crime_db_path:
+            self.crime_db_path = crime_db_path
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        src = sqlite3.connect(self.crime_db_path)
+        try:
+            if row is None:
+                states = []
+                for r in src.execute(SQL_LATEST_PER_MULE):
+                    try:
+                        states.append(MuleState.from_withdrawal(*r))
+                    except ValueError:
+                        self.stats['skipped'] += 1
+                self._spill(states)
+                self.watermark = src.execute("SELECT COALESCE(MAX(id), 0) FROM complaints").fetchone()[0]
+                states.sort(key=lambda s: (s.timestamp, s.complaint_id))
+                hot = states[-self.capacity:] if self.capacity else []
+            else:
+                self.watermark = row[0]
+                hot = [MuleState(*r) for r in self.conn.execute(
+                    "SELECT mule_id, lat, long, hour, day_of_week, timestamp, complaint_id FROM mule_state "
+                    "ORDER BY timestamp DESC, complaint_id DESC LIMIT ?", (self.capacity,)
+                )][::-1]
+        finally:
+            src.close()
+        with self._lock:
+            self._hot.clear()
+            self._evicted.clear()
+            for state in hot:  # oldest first, so the most recent end up most recently used
+                self._hot[state.mule_id] = state
+        self._source_version = None
+        self.catch_up()  # complaints inserted after the spill table's watermark
+        return len(self._hot)
+
+class ComplaintCreate(BaseModel):
+    """Body of POST /complaints: the NOT NULL columns plus what the mule state needs"""
+    complaint_id: str = Field(..., min_length=1)
+    fraud_type: str = Field(..., min_length=1)
+    amount: Optional[float] = Field(None, ge=0)
+    mule_account_id: str = Field(..., min_length=1)
+    withdrawal_atm_id: Optional[str] = None
+    withdrawal_lat: float = Field(..., ge=-90, le=90)
+    withdrawal_long: float = Field(..., ge=-180, le=180)
+    location_name: Optional[str] = None
+    timestamp: Optional[datetime] = None  # defaults to now
+    status: str = 'Open'
+
+def insert_complaint(data, db_path=CRIME_DB_PATH):
+    """Append one complaint to the complaints table; returns (row id, timestamp)"""
+    timestamp = data.get('timestamp') or datetime.now()
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            cur = conn.execute(SQL_INSERT_COMPLAINT, (
+                data.get('complaint_id'), data.get('fraud_type'), data.get('amount'),
+                data.get('mule_account_id'), data.get('withdrawal_atm_id'),
+                data.get('withdrawal_lat'), data.get('withdrawal_long'),
+                data.get('location_name'), timestamp, data.get('status', 'Open'),
+            ))
+        return cur.lastrowid, timestamp
+    finally:
+        conn.close()
@@ -0,0 +1,304 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Optional
+
+import joblib
+import numpy as np
+from pydantic import BaseModel, Field
+
+# The pickled encoder and the shared feature helpers live in backend/scripts
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts')
+sys.path.append(SCRIPTS_DIR)
+
+from features import FEATURES, feature_schema_hash  # noqa: E402
+from forest import CompiledForest, compiled_path, is_forest, save_compiled  # noqa: E402
+import registry  # noqa: E402
+from atm_catalog import CATALOG_DIR, AtmCatalog  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+MODEL_PATH = os.path.join(DATA_DIR, 'model_next_loc.pkl')
+ENCODER_PATH = os.path.join(DATA_DIR, 'label_encoder.pkl')
+
+# Tree votes are grouped on a ~110 m grid (3 decimal places) to rank candidate locations
+VOTE_GRID_DECIMALS = 3
+
+def ensure_compiled(model_path=MODEL_PATH):
+    """
+    Compile the legacy pickle on first use, or when it was retrained after the last
+    compile. Returns None when the pickle is not a random forest (nothing to compile).
+    """
+    path = compiled_path(model_path)
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path) or os.path.getmtime(meta_path) < os.path.getmtime(model_path):
+        model = joblib.load(model_path)
+        if not is_forest(model):
+            return None
+        save_compiled(model, path)
+    return path
+
+class PointModel:
+    """
+    Serving adapter for models without per-tree votes (the histogram gradient
+    boosting backend): the model's prediction is the only vote, so top_k holds
+    that one location and the ATM catalog supplies the alternatives.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def __len__(self):
+        return 1
+
+    def touch(self):
+        pass
+
+    def tree_votes(self, X):
+        return self.model.predict(X)[np.newaxis]
+
+class PredictRequest(BaseModel):
+    mule_id: str
+    lat: float = Field(..., ge=-90, le=90)
+    long: float = Field(..., ge=-180, le=180)
+    timestamp: Optional[datetime] = None  # time of the current withdrawal, defaults to now
+    k: int = Field(3, ge=1, le=10)
+
+class UnknownMuleError(KeyError):
+    pass
+
+class NextLocationPredictor:
+    """
+    Serves the RandomForest trained by scripts/train_model.py.
+    The forest is the array-compiled copy (scripts/forest.py), memory-mapped
+    read-only, so no scikit-learn is imported and no per-call validation is paid.
+    The mean of the tree outputs is exactly model.predict(), and the individual
+    tree outputs are the votes used to rank top-k locations.
+    A model trained with --model hgb is served from its pickle through PointModel.
+    """
+
+    def __init__(self, forest, encoder, version=None, catalog=None):
+        self.forest = forest
+        self.encoder = encoder
+        self.version = version
+        self.catalog = catalog  # AtmCatalog: snaps the predicted point to real ATMs
+
+    @classmethod
+    def load(cls, model_path=MODEL_PATH, encoder_path=ENCODER_PATH, catalog_path=CATALOG_DIR):
+        """Legacy single-file model (no registry yet)"""
+        catalog = AtmCatalog.load(catalog_path) if os.path.exists(catalog_path) else None
+        path = ensure_compiled(model_path)
+        forest = CompiledForest(path) if path else PointModel(joblib.load(model_path))
+        return cls(forest, joblib.load(encoder_path), catalog=catalog)
+
+    @classmethod
+    def load_version(cls, version, root=registry.REGISTRY_DIR):
+        """A registry version; refuses models trained on a different feature schema"""
+        metadata = registry.load_metadata(version, root)
+        if metadata['feature_schema_hash'] != feature_schema_hash():
+            raise ValueError(f"{version} was trained on feature schema {metadata['feature_schema_hash']}, "
+                             f"this server builds {feature_schema_hash()}")
+        path = registry.version_path(version, root)
+        catalog_path = os.path.join(path, 'atms')
+        catalog = AtmCatalog.load(catalog_path) if os.path.exists(catalog_path) else None
+        if metadata.get('backend', 'forest') == 'forest':
+            forest = CompiledForest(os.path.join(path, 'forest'))
+        else:
+            forest = PointModel(joblib.load(os.path.join(path, 'model.pkl')))
+        predictor = cls(forest, joblib.load(os.path.join(path, 'encoder.pkl')), version, catalog)
+        predictor.warm_up()
+        return predictor
+
+    def warm_up(self):
+        """Fault the memory-mapped forest into RAM and run one prediction, before taking traffic"""
+        self.forest.touch()
+        self.forest.tree_votes(np.zeros((1, len(FEATURES)), dtype=np.float32))
+
+    def encode(self, mule_id):
+        """
+        (code, known) for a mule. Unseen mules get the encoder's unknown-mule bucket;
+        only a model trained before the bucket existed raises UnknownMuleError.
+        """
+        code = self.encoder.get(mule_id)
+        if code is not None:
+            return code, True
+        unknown_code = getattr(self.encoder, 'unknown_code', None)
+        if unknown_code is None:
+            raise UnknownMuleError(mule_id)
+        return unknown_code, False
+
+    def build_features(self, codes, lats, longs, timestamps):
+        """Feature matrix (float32, FEATURES order) for a batch of requests"""
+        # Same values as features.time_features, without a pandas round-trip per request
+        hour = [ts.hour for ts in timestamps]
+        day_of_week = [ts.weekday() for ts in timestamps]
+        columns = {
+            'mule_id_encoded': codes,
+            'withdrawal_lat': lats,
+            'withdrawal_long': longs,
+            'hour': hour,
+            'day_of_week': day_of_week,
+        }
+        return np.column_stack([np.asarray(columns[f], dtype=np.float32) for f in FEATURES])
+
+    def tree_votes(self, X):
+        """(n_trees, n_rows, 2) next-location predictions of every tree"""
+        return self.forest.tree_votes(X)
+
+    @staticmethod
+    def rank_votes(votes, ks):
+        """
+        Top-ks[i] grid cells of every row's tree votes, with the share of trees as confidence.
+        votes is (n_trees, n_rows, 2); all rows are ranked with a single np.unique by
+        packing (row, lat cell, long cell) into one non-negative int64 key.
+        """
+        n_trees, n_rows, _ = votes.shape
+        scale = 10 ** VOTE_GRID_DECIMALS
+        cells = np.round(votes * scale).astype(np.int64) + np.array([90 * scale, 180 * scale])
+        cell_keys = cells[:, :, 0] * (360 * scale + 1) + cells[:, :, 1]
+        keys = np.arange(n_rows, dtype=np.int64) * (180 * scale + 1) * (360 * scale + 1) + cell_keys
+        uniq, inverse, counts = np.unique(keys.ravel(), return_inverse=True, return_counts=True)
+        lat = np.bincount(inverse.ravel(), weights=votes[:, :, 0].ravel()) / counts
+        long = np.bincount(inverse.ravel(), weights=votes[:, :, 1].ravel()) / counts
+        rows = uniq // ((180 * scale + 1) * (360 * scale + 1))
+        # Most votes first within each row (unique keys are already grouped by row)
+        order = np.lexsort((-counts, rows))
+        row_starts = np.searchsorted(rows[order], np.arange(n_rows))
+        top = []
+        for i in range(n_rows):
+            best = order[row_starts[i]:row_starts[i] + ks[i]]
+            best = best[rows[best] == i]
+            top.append([
+                {
+                    'lat': float(lat[c]),
+                    'long': float(long[c]),
+                    'confidence': round(float(counts[c]) / n_trees * 100, 1),
+                }
+                for c in best
+            ])
+        return top
+
+    def predict_features(self, X, ks):
+        """
+        Score a prepared feature matrix; one result dict per row, ks[i] locations for row i.
+        With an ATM catalog, the predicted point is also snapped to its ks[i] nearest ATMs.
+        """
+        votes = self.tree_votes(X)
+        mean = votes.mean(axis=0)
+        results = [
+            {
+                'predicted': {'lat': float(mean[i, 0]), 'long': float(mean[i, 1])},
+                'top_k': top,
+            }
+            for i, top in enumerate(self.rank_votes(votes, ks))
+        ]
+        if self.catalog is not None:
+            for result, atms in zip(results, self.catalog.snap_many(mean[:, 0], mean[:, 1], ks)):
+                result['atms'] = atms
+        return results
+
+    def predict(self, req: PredictRequest):
+        started = time.perf_counter()
+        code, known = self.encode(req.mule_id)
+        X = self.build_features([code], [req.lat], [req.long], [req.timestamp or datetime.now()])
+        result = self.predict_features(X, [req.k])[0]
+        result['mule_id'] = req.mule_id
+        result['mule_known'] = known
+        result['model_version'] = self.version
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    def predict_batch(self, reqs):
+        """
+        Score many requests in one pass over the trees (the MicroBatcher callback).
+        Returns one result per request; a mule that cannot be encoded gets an
+        UnknownMuleError in its slot instead of failing the whole batch.
+        """
+        now = datetime.now()
+        results, rows, codes, known = [], [], [], []
+        for i, req in enumerate(reqs):
+            try:
+                code, is_known = self.encode(req.mule_id)
+            except UnknownMuleError as e:
+                results.append(e)
+                continue
+            results.append(None)
+            rows.append(i)
+            codes.append(code)
+            known.append(is_known)
+        if not rows:
+            return results
+        X = self.build_features(
+            codes,
+            [reqs[i].lat for i in rows],
+            [reqs[i].long for i in rows],
+            [reqs[i].timestamp or now for i in rows],
+        )
+        for i, is_known, result in zip(rows, known, self.predict_features(X, [reqs[i].k for i in rows])):
+            result['mule_id'] = reqs[i].mule_id
+            result['mule_known'] = is_known
+            result['model_version'] = self.version
+            results[i] = result
+        return results
+
+class ModelWatcher:
+    """
+    Keeps `self.predictor` on the registry's current version.
+    A background task polls registry/CURRENT; a new version is loaded and warmed
+    up in a worker thread while the old one keeps serving, then swapped in with a
+    single reference assignment. A batch already being scored holds its own
+    reference, so in-flight requests finish on the old model. A version that
+    fails to load is skipped and the old model stays live.
+    """
+
+    def __init__(self, root=registry.REGISTRY_DIR, poll_s=2.0):
+        self.root = root
+        self.poll_s = poll_s
+        self.predictor = None
+        self.version = None
+        self.swaps = 0
+        self._failed = set()
+        self._task = None
+
+    def load_initial(self):
+        """Blocking load at startup: the registry's current version, else the legacy model file"""
+        version = registry.current_version(self.root)
+        if version:
+            self.predictor, self.version = NextLocationPredictor.load_version(version, self.root), version
+        elif os.path.exists(MODEL_PATH):
+            self.predictor = NextLocationPredictor.load()
+        return self.predictor
+
+    async def check(self):
+        version = registry.current_version(self.root)
+        if not version or version == self.version or version in self._failed:
+            return False
+        try:
+            predictor = await asyncio.to_thread(NextLocationPredictor.load_version, version, self.root)
+        except Exception as e:
+            self._failed.add(version)
+            print(f"⚠️ Model {version} not loaded, still serving {self.version}: {e}")
+            return False
+        self.predictor, self.version = predictor, version
+        self.swaps += 1
+        print(f"🔄 Now serving model {version}")
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_s)
+            await self.check()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
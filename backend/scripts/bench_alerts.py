@@ -0,0 +1,192 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+# --- CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_URL = 'http://127.0.0.1:8000'
+# Path prefix of each implementation of the /alerts handlers in backend/main.py
+PATHS = {'sync': '/alerts/sync', 'async': '/alerts'}
+
+def sample_alert(rng):
+    return {
+        'type': str(rng.choice(['Mule Withdrawal', 'Predicted Hotspot', 'Velocity Spike'])),
+        'location': str(rng.choice(['Delhi NCR', 'Mumbai', 'Bangalore Urban', 'Kolkata'])),
+        'priority': str(rng.choice(['High', 'Medium', 'Low'])),
+        'details': 'load test',
+    }
+
+async def worker(client, path, queue, latencies, errors):
+    while True:
+        try:
+            method, payload = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        if method == 'POST':
+            response = await client.post(path, json=payload)
+        else:
+            response = await client.get(path)
+        latencies[method].append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+async def run(client, path, n, concurrency, read_fraction, seed=42):
+    """n requests against `path`, a `read_fraction` share of them GETs, the rest POSTs"""
+    rng = np.random.default_rng(seed)
+    queue = asyncio.Queue()
+    for is_read in rng.random(n) < read_fraction:
+        queue.put_nowait(('GET', None) if is_read else ('POST', sample_alert(rng)))
+    latencies, errors = {'GET': [], 'POST': []}, []
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(client, path, queue, latencies, errors) for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+async def compare(client, args):
+    # POSTs grow the table both paths read, so the paths take turns in rounds
+    # instead of one running entirely on a smaller table than the other
+    results = {name: (0.0, {'GET': [], 'POST': []}, []) for name in PATHS}
+    for name, path in PATHS.items():
+        await run(client, path, args.warmup, args.concurrency, args.read_fraction)
+    for round_ in range(args.rounds):
+        for name, path in PATHS.items():
+            elapsed, latencies, errors = await run(client, path, args.requests // args.rounds, args.concurrency,
+                                                   args.read_fraction, seed=round_)
+            total, all_latencies, all_errors = results[name]
+            for method, values in latencies.items():
+                all_latencies[method].extend(values)
+            results[name] = (total + elapsed, all_latencies, all_errors + errors)
+
+    print(f"\n📊 --- /alerts: sync vs async handlers ---")
+    print(f"   {args.requests} requests per path at concurrency {args.concurrency}, {args.read_fraction:.0%} GET")
+    print(f"   {'path':<6} {'req/s':>8} {'errors':>7} {'GET p50':>9} {'GET p99':>9} {'POST p50':>9} {'POST p99':>9}")
+    for name, (elapsed, latencies, errors) in results.items():
+        cells = []
+        for method in ('GET', 'POST'):
+            ms = np.asarray(latencies[method]) * 1000
+            cells += [np.percentile(ms, 50), np.percentile(ms, 99)] if len(ms) else [np.nan, np.nan]
+        total = sum(len(v) for v in latencies.values())
+        print(f"   {name:<6} {total / elapsed:>8,.0f} {len(errors):>7} " + ' '.join(f"{c:>9.2f}" for c in cells))
+
+async def ingest(client, args):
+    """alerts/s for the same alerts sent one POST /alerts each vs in POST /alerts/bulk bursts"""
+    rng = np.random.default_rng(42)
+    alerts = [sample_alert(rng) for _ in range(args.requests)]
+    bursts = [alerts[i:i + args.burst] for i in range(0, len(alerts), args.burst)]
+    results = {}
+
+    queue = asyncio.Queue()
+    for alert in alerts:
+        queue.put_nowait(('POST', alert))
+    latencies, errors = {'GET': [], 'POST': []}, []
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(client, '/alerts', queue, latencies, errors) for _ in range(args.concurrency)))
+    results['single POST /alerts'] = (time.perf_counter() - started, errors)
+
+    for label, encode, content_type in (
+        ('bulk JSON array', json.dumps, 'application/json'),
+        ('bulk NDJSON', lambda burst: '\n'.join(map(json.dumps, burst)), 'application/x-ndjson'),
+    ):
+        errors, started = [], time.perf_counter()
+        for burst in bursts:
+            response = await client.post('/alerts/bulk', params={'batch_size': args.batch_size},
+                                         content=encode(burst), headers={'content-type': content_type})
+            if response.status_code != 200 or len(response.json()['ids']) != len(burst):
+                errors.append(response.status_code)
+        results[label] = (time.perf_counter() - started, errors)
+
+    stats = (await client.get('/alerts/stats')).json()
+    if stats['group_commit']:
+        print(f"\n📦 Group commit (flush {stats['window_ms']} ms / {stats['max_batch']} alerts): "
+              f"mean flush {stats['mean_batch_size']} alerts, queue delay {stats['queue_delay_ms']}, "
+              f"flush time {stats['batch_time_ms']}")
+    print(f"\n📥 --- Alert ingestion: {len(alerts)} alerts, bursts of {args.burst}, batch size {args.batch_size} ---")
+    for label, (elapsed, errors) in results.items():
+        print(f"   {label:<20} {len(alerts) / elapsed:>10,.0f} alerts/s   {len(errors)} errors")
+
+async def paginate(client, args):
+    """Walk every page of GET /alerts by cursor: the last pages should cost what the first ones do"""
+    filters = {'type': args.filter_type} if args.filter_type else {}
+    timings, cursor, total = [], None, 0
+    while True:
+        params = dict(filters, limit=args.page_size, **({'cursor': cursor} if cursor else {}))
+        started = time.perf_counter()
+        response = await client.get('/alerts', params=params)
+        timings.append(time.perf_counter() - started)
+        total += len(response.json())
+        cursor = response.headers.get('x-next-cursor')
+        if not cursor:
+            break
+    ms = np.asarray(timings) * 1000
+    tenth = max(1, len(ms) // 10)
+    print(f"\n📄 --- GET /alerts keyset pagination: {total} alerts in {len(ms)} pages of {args.page_size} "
+          f"{filters or ''} ---")
+    for label, part in (('first 10% pages', ms[:tenth]), ('last 10% pages', ms[-tenth:]), ('all pages', ms)):
+        print(f"   {label:<16} p50 {np.percentile(part, 50):7.2f} ms   p99 {np.percentile(part, 99):7.2f} ms")
+
+async def stream_latency(client, args):
+    """Time from POST /alerts to the alert arriving on a GET /alerts/stream subscriber"""
+    rng = np.random.default_rng(42)
+    received, ready = {}, asyncio.Event()
+
+    async def subscribe():
+        async with client.stream('GET', '/alerts/stream', timeout=None) as response:
+            async for line in response.aiter_lines():
+                ready.set()  # the 'retry:' line: subscribed
+                if line.startswith('data: '):
+                    received[json.loads(line[len('data: '):])['id']] = time.perf_counter()
+
+    listener = asyncio.create_task(subscribe())
+    await asyncio.wait_for(ready.wait(), 10)
+    sent = {}
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        response = await client.post('/alerts', json=sample_alert(rng))
+        sent[response.json()['id']] = started
+    await asyncio.sleep(0.5)
+    listener.cancel()
+    ms = np.asarray([received[i] - t for i, t in sent.items() if i in received]) * 1000
+    print(f"\n📡 --- /alerts/stream delivery: {len(ms)}/{len(sent)} alerts received ---")
+    print(f"   POST start -> event   p50 {np.percentile(ms, 50):7.2f} ms   p99 {np.percentile(ms, 99):7.2f} ms")
+
+async def main(args):
+    bench = stream_latency if args.stream else paginate if args.paginate else ingest if args.bulk else compare
+    if args.in_process:
+        # Drive the ASGI app directly: measures the handlers and the database, not the network stack
+        if args.group_commit:
+            os.environ['ALERT_GROUP_COMMIT'] = '1'
+        sys.path.append(os.path.join(BASE_DIR, '../..'))
+        from backend.main import app
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+                return await bench(client, args)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        return await bench(client, args)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the sync and async /alerts handlers under concurrent load')
+    parser.add_argument('--bulk', action='store_true', help='compare single POSTs with POST /alerts/bulk instead')
+    parser.add_argument('--stream', action='store_true',
+                        help='measure POST -> /alerts/stream delivery latency instead (needs --url, not --in-process)')
+    parser.add_argument('--paginate', action='store_true', help='time every page of GET /alerts instead')
+    parser.add_argument('--page-size', type=int, default=100, help='alerts per page (--paginate)')
+    parser.add_argument('--filter-type', help='only alerts of this type (--paginate)')
+    parser.add_argument('--group-commit', action='store_true',
+                        help='with --in-process: enable the POST /alerts write-behind buffer (ALERT_GROUP_COMMIT=1)')
+    parser.add_argument('--burst', type=int, default=1000, help='alerts per /alerts/bulk request (--bulk)')
+    parser.add_argument('--batch-size', type=int, default=500, help='rows per INSERT statement (--bulk)')
+    parser.add_argument('--url', default=DEFAULT_URL, help='base URL of a running server')
+    parser.add_argument('--in-process', action='store_true', help='call backend.main.app through ASGI instead of HTTP')
+    parser.add_argument('--requests', type=int, default=2000, help='measured requests per path (alerts to ingest with --bulk)')
+    parser.add_argument('--warmup', type=int, default=100, help='unmeasured warm-up requests per path')
+    parser.add_argument('--concurrency', type=int, default=32, help='requests in flight')
+    parser.add_argument('--rounds', type=int, default=5, help='alternations between the two paths')
+    parser.add_argument('--read-fraction', type=float, default=0.8, help='share of GET /alerts requests')
+    asyncio.run(main(parser.parse_args()))
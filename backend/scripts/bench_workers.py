@@ -0,0 +1,90 @@
+"""
+Throughput scaling of the multi-process prediction server (backend/serve.py)
+Starts the server with 1, 2, 4 ... N workers and replays withdrawals from the
+verify dataset (crime_data.db) against POST /predict, reporting requests/s,
+latency and scaling efficiency versus one worker.
+
+The load generator runs on the same machine and competes for cores, so use
+--max-workers below the core count to leave it room. Scaling can only show on
+a host with more cores than workers: on a single core, extra workers just
+contend for it and throughput drops. On a 1-core host (default settings,
+3000 requests): 1 worker 168-181 req/s, 2 workers 131-144 (0.72-0.86x),
+4 workers 134 (0.80x).
+
+Usage: python backend/scripts/bench_workers.py [--max-workers N] [--requests 3000]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from load_test import run, sample_payloads
+
+# --- CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.abspath(os.path.join(BASE_DIR, '../..'))
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if max_workers > 1:
+        counts.append(max_workers)
+    return counts
+
+def start_server(workers, port):
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'backend.serve', '--workers', str(workers), '--port', str(port)],
+        cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(url + '/model', timeout=1).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit(f"❌ Server with {workers} workers did not start")
+
+async def measure(url, payloads, warmup, concurrency):
+    async with httpx.AsyncClient(base_url=url, timeout=30,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        await run(client, payloads[:warmup], concurrency)
+        elapsed, latencies, _, errors, _ = await run(client, payloads[warmup:], concurrency)
+    return len(latencies) / elapsed, np.asarray(latencies) * 1000, len(errors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='largest worker count tried')
+    parser.add_argument('--requests', type=int, default=3000, help='measured requests per worker count')
+    parser.add_argument('--warmup', type=int, default=200, help='unmeasured warm-up requests')
+    parser.add_argument('--concurrency', type=int, default=16, help='requests in flight per worker')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    payloads = sample_payloads(args.requests + args.warmup)
+    print(f"🖥️  {os.cpu_count()} cores, {args.requests} requests per run\n")
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'speed-up':>9} {'efficiency':>10}")
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        proc, url = start_server(workers, args.port)
+        try:
+            rps, ms, errors = asyncio.run(measure(url, payloads, args.warmup, args.concurrency * workers))
+        finally:
+            proc.terminate()
+            proc.wait()
+        baseline = baseline or rps
+        print(f"{workers:>7} {rps:>9,.0f} {np.percentile(ms, 50):>8.2f} {np.percentile(ms, 99):>8.2f} "
+              f"{errors:>7} {rps / baseline:>8.2f}x {rps / baseline / workers:>9.0%}")
+
+if __name__ == "__main__":
+    main()
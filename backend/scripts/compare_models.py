@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import pickle
+import argparse
+import tempfile
+import numpy as np
+
+from features import connect_readonly, fit_encoder_streaming, open_feature_store, with_unknown_bucket
+from estimators import BACKENDS, make_model
+from forest import CompiledForest, is_forest, save_compiled
+from geo import haversine
+import tune
+
+# The serving adapters live in backend/predictor.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from predictor import PointModel  # noqa: E402
+
+# --- CONFIG ---
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/crime_data.db')
+SINGLE_ROW_CALLS = 200  # predictions timed one row at a time
+SERVED_BATCH = 64  # rows per call in the batch timing: the /predict micro-batcher's default PREDICT_MAX_BATCH
+
+def served_predict(served, X):
+    """Point prediction the way NextLocationPredictor.predict_features computes it: the mean tree vote"""
+    return served.tree_votes(X).mean(axis=0)
+
+def benchmark(backend, X_train, y_train, X_val, y_val, cores):
+    """Fit / size / throughput / error of one backend on a fixed train-validation split"""
+    model = make_model(backend, cores)
+    started = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - started
+    model.n_jobs = None
+
+    # What the registry stores (pickle) and what the API serves: the forest through
+    # its compiled, memory-mapped arrays, the boosted model through PointModel
+    model_bytes = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    with tempfile.TemporaryDirectory() as tmp:
+        if is_forest(model):
+            path = os.path.join(tmp, 'forest')
+            save_compiled(model, path)
+            served = CompiledForest(path)
+            served_bytes = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        else:
+            served, served_bytes = PointModel(model), model_bytes
+        served.touch()
+
+        started = time.perf_counter()
+        pred = np.vstack([served_predict(served, X_val[i:i + SERVED_BATCH])
+                          for i in range(0, len(X_val), SERVED_BATCH)])
+        batch_rows_s = len(X_val) / (time.perf_counter() - started)
+        started = time.perf_counter()
+        for i in range(SINGLE_ROW_CALLS):
+            served_predict(served, X_val[i % len(X_val):i % len(X_val) + 1])
+        single_ms = (time.perf_counter() - started) / SINGLE_ROW_CALLS * 1000
+        del served  # drop the memory maps before the directory goes
+
+    errors = haversine(y_val[:, 1], y_val[:, 0], pred[:, 1], pred[:, 0])
+    return {
+        'backend': backend,
+        'fit_s': fit_s,
+        'model_mb': model_bytes / 1e6,
+        'served_mb': served_bytes / 1e6,
+        'batch_rows_s': batch_rows_s,
+        'single_ms': single_ms,
+        'mean_error_m': errors.mean(),
+        'p50_error_m': np.median(errors),
+        'p90_error_m': np.percentile(errors, 90),
+    }
+
+def compare(cores, val_fraction=0.2, backends=BACKENDS):
+    """
+    Train every backend on the same time-based split of the feature store
+    (oldest patterns train, newest validate, as in train_model.py --search).
+    """
+    conn = connect_readonly(DB_PATH)
+    encoder = fit_encoder_streaming(conn)
+    conn.close()
+    store = open_feature_store(DB_PATH, encoder)
+    X_train, y_train, X_val, y_val = tune.load_split(store, tune.time_split_cutoff(store, val_fraction))
+    X_train, y_train = with_unknown_bucket(X_train, y_train)
+    print(f"⚖️  {len(X_train)} training / {len(X_val)} validation patterns, {cores} core(s)")
+    return [benchmark(backend, X_train, y_train, X_val, y_val, cores) for backend in backends]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the model backends train_model.py can fit")
+    parser.add_argument("--cores", type=int, default=os.cpu_count(), help="core budget for fitting")
+    parser.add_argument("--val-fraction", type=float, default=0.2, help="newest share of patterns held out")
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print("❌ Error: Database not found. Run generate_data.py first.")
+    else:
+        results = compare(args.cores, args.val_fraction)
+        print(f"\n{'backend':<8} {'fit s':>8} {'pickle MB':>10} {'served MB':>10} {'rows/s':>11} "
+              f"{'1-row ms':>9} {'mean m':>9} {'p50 m':>8} {'p90 m':>9}")
+        for r in results:
+            print(f"{r['backend']:<8} {r['fit_s']:>8.2f} {r['model_mb']:>10.2f} {r['served_mb']:>10.2f} "
+                  f"{r['batch_rows_s']:>11,.0f} {r['single_ms']:>9.2f} {r['mean_error_m']:>9.0f} "
+                  f"{r['p50_error_m']:>8.0f} {r['p90_error_m']:>9.0f}")
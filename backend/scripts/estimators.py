@@ -0,0 +1,30 @@
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+
+# --- CONFIG ---
+# Model backends train_model.py can fit on the feature store (--model)
+BACKENDS = ['forest', 'hgb']
+
+# Histogram gradient boosting: features are binned into <= 255 bins once, so a
+# split costs O(bins) instead of O(rows log rows), and a prediction walks one
+# short tree per boosting round. Boosting stops early on an internal 10% holdout.
+HGB_PARAMS = {
+    'max_iter': 300,
+    'learning_rate': 0.1,
+    'max_leaf_nodes': 63,
+    'early_stopping': True,
+    'validation_fraction': 0.1,
+    'n_iter_no_change': 10,
+}
+
+def make_model(backend='forest', cores=None, **params):
+    """Unfitted regressor for `backend`; `params` override the defaults"""
+    if backend == 'forest':
+        # n_estimators=100 means we use 100 "Decision Trees" voting together
+        return RandomForestRegressor(**{'n_estimators': 100, 'random_state': 42, 'n_jobs': cores, **params})
+    if backend == 'hgb':
+        # HistGradientBoostingRegressor is single-output: one booster for lat, one for long.
+        # Each uses OpenMP threads internally; n_jobs fits the two side by side.
+        booster = HistGradientBoostingRegressor(**{**HGB_PARAMS, 'random_state': 42, **params})
+        return MultiOutputRegressor(booster, n_jobs=min(cores or 1, 2))
+    raise ValueError(f"Unknown model backend {backend!r}, expected one of {BACKENDS}")
@@ -0,0 +1,366 @@
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+from urllib.request import pathname2url
+import numpy as np
+import pandas as pd
+
+# --- SHARED FEATURE DEFINITIONS ---
+# Model inputs and outputs for the "next withdrawal location" regressor
+FEATURES = ['mule_id_encoded', 'withdrawal_lat', 'withdrawal_long', 'hour', 'day_of_week']
+TARGETS = ['next_lat', 'next_long']
+
+# Bump whenever the model's features change (part of the registry's feature schema hash)
+FEATURE_VERSION = 1
+# Bump whenever the store layout changes, so cached stores are rebuilt
+STORE_VERSION = 2
+FEATURE_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/features')
+
+# Reserved mule code for mules the model has never seen. Training copies a random
+# UNKNOWN_MULE_FRACTION of the rows with their mule replaced by this code, so the
+# forest learns a location-and-time-only answer for new mules (no refit needed).
+UNKNOWN_MULE_CODE = -1
+UNKNOWN_MULE_FRACTION = 0.1
+
+class MuleEncoder:
+    """
+    Append-only replacement for sklearn's LabelEncoder.
+    LabelEncoder keeps classes sorted, so adding one new mule renumbers every mule
+    after it and invalidates the trained model. Here codes are assigned in order of
+    first appearance and never change; fit() on a fresh set still gives the same
+    codes as LabelEncoder (sorted), so old models stay compatible.
+    """
+
+    # Code for unseen mules if the model was trained with the unknown bucket, else None
+    # (class attribute, so encoders pickled before the bucket existed load as None)
+    unknown_code = None
+
+    def __init__(self, classes=()):
+        self.classes_ = np.asarray(list(classes), dtype=object)
+        self._index = {mule: code for code, mule in enumerate(self.classes_)}
+
+    @classmethod
+    def from_label_encoder(cls, le):
+        return cls(le.classes_)
+
+    def fit(self, mules):
+        self.__init__(sorted(pd.unique(pd.Series(mules).astype(object))))
+        return self
+
+    def fit_transform(self, mules):
+        return self.fit(mules).transform(mules)
+
+    def extend(self, mules):
+        """Give codes to unseen mules (sorted among themselves); returns how many were added"""
+        new = sorted(m for m in pd.unique(pd.Series(mules).astype(object)) if m not in self._index)
+        for mule in new:
+            self._index[mule] = len(self._index)
+        if new:
+            self.classes_ = np.concatenate([self.classes_, np.asarray(new, dtype=object)])
+        return len(new)
+
+    def transform(self, mules, allow_unknown=False):
+        """Codes of `mules`; unseen mules raise, or get unknown_code when allowed and trained for"""
+        codes = pd.Series(mules).astype(object).map(self._index)
+        if allow_unknown and self.unknown_code is not None:
+            codes = codes.fillna(self.unknown_code)
+        if codes.isna().any():
+            unseen = codes.index[codes.isna()]
+            raise ValueError(f"y contains previously unseen labels: {list(pd.Series(mules).loc[unseen][:5])}")
+        return codes.to_numpy(dtype=np.int64)
+
+    def get(self, mule, default=None):
+        """Code of one mule (plain dict lookup, for the serving path)"""
+        return self._index.get(mule, default)
+
+    def inverse_transform(self, codes):
+        return self.classes_[np.asarray(codes)]
+
+    def __len__(self):
+        return len(self.classes_)
+
+def with_unknown_bucket(X, y, fraction=UNKNOWN_MULE_FRACTION, seed=42):
+    """Append copies of a random `fraction` of the rows of X (FEATURES order) with the mule set to UNKNOWN_MULE_CODE"""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(X), size=int(len(X) * fraction), replace=False)
+    bucket = X[rows].copy()
+    bucket[:, FEATURES.index('mule_id_encoded')] = UNKNOWN_MULE_CODE
+    return np.vstack([X, bucket]), np.vstack([y, y[rows]])
+
+def time_features(timestamps):
+    """(hour, day_of_week) of a Series of timestamps or timestamp strings"""
+    timestamps = pd.to_datetime(timestamps)
+    return timestamps.dt.hour, timestamps.dt.dayofweek
+
+def build_training_pairs(df, encoder, last_by_mule=None):
+    """
+    Turn complaints into (current withdrawal -> next withdrawal) training pairs.
+
+    `last_by_mule` is the sequence state left by the previous run: the latest
+    (timestamp, withdrawal_lat, withdrawal_long) of every mule, indexed by
+    mule_account_id. Those rows are put back in front of the new complaints so
+    a mule's first new complaint becomes the target of its previous one.
+
+    Returns (pairs, new_last_by_mule).
+    """
+    df = df[['mule_account_id', 'timestamp', 'withdrawal_lat', 'withdrawal_long']].copy()
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['_carried'] = False
+    if last_by_mule is not None and len(last_by_mule):
+        carried = last_by_mule[last_by_mule.index.isin(df['mule_account_id'])].reset_index()
+        carried['_carried'] = True
+        df = pd.concat([carried, df], ignore_index=True)
+
+    # Sort by Mule ID and Time (Crucial for "Next Location" logic); carried state first on ties
+    df = df.sort_values(by=['mule_account_id', 'timestamp', '_carried'],
+                        ascending=[True, True, False], kind='stable')
+    df['hour'], df['day_of_week'] = time_features(df['timestamp'])
+    df['mule_id_encoded'] = encoder.transform(df['mule_account_id'])
+
+    grouped = df.groupby('mule_account_id', sort=False)
+    df['next_lat'] = grouped['withdrawal_lat'].shift(-1)
+    df['next_long'] = grouped['withdrawal_long'].shift(-1)
+
+    last = grouped[['timestamp', 'withdrawal_lat', 'withdrawal_long']].last()
+    if last_by_mule is not None and len(last_by_mule):
+        last = pd.concat([last_by_mule[~last_by_mule.index.isin(last.index)], last])
+
+    pairs = df.dropna(subset=TARGETS)
+    return pairs, last
+
+# ==================== STREAMING FEATURE PIPELINE ====================
+
+# On-disk dtype of every column in a feature store
+STORE_COLUMNS = {
+    'id': 'int64',                # complaint the pair starts from
+    'timestamp': 'int64',         # its time, epoch seconds (time-based validation splits)
+    'mule_id_encoded': 'int64',
+    'withdrawal_lat': 'float64',
+    'withdrawal_long': 'float64',
+    'hour': 'int8',
+    'day_of_week': 'int8',
+    'fraud_type_code': 'int16',   # index into meta['fraud_types']
+    'next_lat': 'float64',
+    'next_long': 'float64',
+}
+
+# Covering index for the (mule, time) scan, so SQLite streams rows in order instead of
+# sorting the table. generate_data.py creates it: the pipeline never writes to the database.
+SEQUENCE_INDEX = 'idx_complaints_mule_ts'
+
+def connect_readonly(db_path):
+    """Read-only connection to the complaints database (training must not change the file)"""
+    return sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro", uri=True)
+
+class FeatureStore:
+    """
+    Column-per-file feature matrix on disk. Every column is a raw little-endian
+    NumPy array opened with np.memmap, so readers only page in what they touch
+    and several processes share the OS page cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.rows = self.meta['rows']
+        self.columns = {
+            name: (np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode='r', shape=(self.rows,))
+                   if self.rows else np.empty(0, dtype=dtype))
+            for name, dtype in self.meta['columns'].items()
+        }
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def matrix(self, names, start=0, stop=None, dtype=np.float64):
+        """Stack `names` for rows [start, stop) into one (n, len(names)) array"""
+        return np.column_stack([self.columns[n][start:stop].astype(dtype, copy=False) for n in names])
+
+    def take(self, names, rows, dtype=np.float64):
+        """Stack `names` for the given row indices (sorted indices page in the least)"""
+        return np.column_stack([self.columns[n][rows].astype(dtype, copy=False) for n in names])
+
+    def last_by_mule(self):
+        """Latest withdrawal of every mule at the time the store was built"""
+        return pd.read_pickle(os.path.join(self.path, 'last_by_mule.pkl'))
+
+    def close(self):
+        """Drop the memory maps (needed before deleting the files on Windows)"""
+        self.columns = {}
+
+def fit_encoder_streaming(conn, chunk_rows=200_000):
+    """MuleEncoder over every mule in the table without loading the table"""
+    cur = conn.execute("SELECT DISTINCT mule_account_id FROM complaints ORDER BY mule_account_id")
+    classes = []
+    while rows := cur.fetchmany(chunk_rows):
+        classes.extend(r[0] for r in rows)
+    return MuleEncoder(classes)
+
+def build_feature_store(db_path, encoder, out_dir, chunk_rows=200_000):
+    """
+    Stream `complaints` in (mule, timestamp) order, chunk by chunk, and write the
+    training pairs to a FeatureStore in `out_dir`. Peak memory is one chunk plus
+    the per-mule state, however large the table is.
+
+    Rows are sorted by mule, so only the chunk's final row can have its "next"
+    withdrawal in the following chunk: it is held back and put in front of the
+    next chunk, which keeps the shifted targets exact across chunk boundaries.
+
+    Mules the encoder has not seen yet (complaints added since it was fitted) are
+    stored with its unknown_code, the code the model scores them with.
+
+    Returns (store, last_by_mule) where last_by_mule is the latest withdrawal of
+    every mule (the sequence state used by incremental training).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    conn = connect_readonly(db_path)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (SEQUENCE_INDEX,)).fetchone():
+        print(f"⚠️ Index {SEQUENCE_INDEX} is missing, so the scan sorts the whole table. "
+              "Run generate_data.py (e.g. --rows 0) to add it.")
+    fraud_types = [r[0] for r in conn.execute("SELECT DISTINCT fraud_type FROM complaints ORDER BY fraud_type")]
+    fraud_codes = {name: code for code, name in enumerate(fraud_types)}
+    cur = conn.execute("""
+        SELECT id, mule_account_id, timestamp, withdrawal_lat, withdrawal_long, fraud_type
+        FROM complaints ORDER BY mule_account_id, timestamp, id
+    """)
+    names = ['id', 'mule_account_id', 'timestamp', 'withdrawal_lat', 'withdrawal_long', 'fraud_type']
+
+    files = {name: open(os.path.join(out_dir, f"{name}.bin"), 'wb') for name in STORE_COLUMNS}
+    rows_written = 0
+    last_rows = []
+    carry = None
+    try:
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows and carry is None:
+                break
+            df = pd.DataFrame(rows, columns=names)
+            if carry is not None:
+                df = pd.concat([carry, df], ignore_index=True) if rows else carry.reset_index(drop=True)
+            final = not rows
+            # Hold back the last row unless the table is exhausted
+            carry = None if final else df.iloc[-1:]
+
+            grouped = df.groupby('mule_account_id', sort=False)
+            df['next_lat'] = grouped['withdrawal_lat'].shift(-1)
+            df['next_long'] = grouped['withdrawal_long'].shift(-1)
+
+            ends = (df['mule_account_id'] != df['mule_account_id'].shift(-1)).to_numpy(copy=True)
+            if not final:
+                ends[-1] = False
+            last_rows.append(df.loc[ends, ['mule_account_id', 'timestamp', 'withdrawal_lat', 'withdrawal_long']])
+
+            pairs = df.dropna(subset=TARGETS)
+            if len(pairs):
+                timestamps = pd.to_datetime(pairs['timestamp'])
+                hour, day_of_week = time_features(timestamps)
+                out = {
+                    'id': pairs['id'],
+                    'timestamp': timestamps.astype('datetime64[s]').astype('int64'),
+                    'mule_id_encoded': encoder.transform(pairs['mule_account_id'], allow_unknown=True),
+                    'withdrawal_lat': pairs['withdrawal_lat'],
+                    'withdrawal_long': pairs['withdrawal_long'],
+                    'hour': hour,
+                    'day_of_week': day_of_week,
+                    'fraud_type_code': pairs['fraud_type'].map(fraud_codes),
+                    'next_lat': pairs['next_lat'],
+                    'next_long': pairs['next_long'],
+                }
+                for name, dtype in STORE_COLUMNS.items():
+                    files[name].write(np.asarray(out[name], dtype=dtype).tobytes())
+                rows_written += len(pairs)
+            if final:
+                break
+    finally:
+        for f in files.values():
+            f.close()
+        conn.close()
+
+    last_by_mule = pd.concat(last_rows, ignore_index=True) if last_rows else pd.DataFrame(
+        columns=['mule_account_id', 'timestamp', 'withdrawal_lat', 'withdrawal_long'])
+    last_by_mule['timestamp'] = pd.to_datetime(last_by_mule['timestamp'])
+    last_by_mule = last_by_mule.set_index('mule_account_id')
+    last_by_mule.to_pickle(os.path.join(out_dir, 'last_by_mule.pkl'))
+
+    # meta.json is written last: a directory without it is an unfinished build
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump({'rows': rows_written, 'columns': STORE_COLUMNS, 'fraud_types': fraud_types}, f, indent=2)
+    return FeatureStore(out_dir), last_by_mule
+
+# ==================== VERSIONED FEATURE STORE ====================
+
+def encoder_hash(encoder):
+    """Stable fingerprint of a mule encoder's code assignment, unseen-mule code included"""
+    digest = hashlib.sha1()
+    digest.update(f"unknown={getattr(encoder, 'unknown_code', None)}".encode())
+    for mule in encoder.classes_:
+        digest.update(str(mule).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()[:12]
+
+def feature_schema_hash():
+    """Fingerprint of the model's input/output contract; a model only serves code with the same hash"""
+    schema = json.dumps({'version': FEATURE_VERSION, 'features': FEATURES, 'targets': TARGETS})
+    return hashlib.sha1(schema.encode()).hexdigest()[:12]
+
+def data_watermark(db_path):
+    """(max id, row count) of the complaints table: changes whenever rows are added or removed"""
+    conn = connect_readonly(db_path)
+    try:
+        max_id, count = conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM complaints").fetchone()
+    finally:
+        conn.close()
+    return max_id, count
+
+def feature_store_key(db_path, encoder):
+    max_id, count = data_watermark(db_path)
+    return f"v{FEATURE_VERSION}.{STORE_VERSION}-id{max_id}-n{count}-enc{encoder_hash(encoder)}"
+
+def open_feature_store(db_path, encoder, root=FEATURE_STORE_DIR, chunk_rows=200_000, keep=2):
+    """
+    Return the feature store for the current data and encoder, building it only if
+    no store with the same key exists. Training writes it, and verification or
+    batch scoring with the saved encoder then memory-map the same files with no
+    recomputation. The `keep` most recent stores are kept, older ones deleted.
+    """
+    key = feature_store_key(db_path, encoder)
+    path = os.path.join(root, key)
+    if os.path.exists(os.path.join(path, 'meta.json')):
+        print(f"📦 Using cached feature store {key}")
+        return FeatureStore(path)
+
+    print(f"🛠️  Building feature store {key}...")
+    building = path + '.building'
+    shutil.rmtree(building, ignore_errors=True)
+    store, _ = build_feature_store(db_path, encoder, building, chunk_rows)
+    store.close()
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(building, path)
+
+    stores = sorted(
+        (d for d in os.listdir(root) if d.startswith('v') and not d.endswith('.building')),
+        key=lambda d: os.path.getmtime(os.path.join(root, d)), reverse=True)
+    for old in stores[keep:]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return FeatureStore(path)
+
+def predict_store(model, store, chunk_rows=100_000, mule_code=None):
+    """
+    Batch-score every row of a feature store, one chunk of the memory map at a time.
+    With `mule_code`, every row is scored as that mule (e.g. UNKNOWN_MULE_CODE).
+    """
+    if not len(store):
+        return np.empty((0, len(TARGETS)))
+    chunks = []
+    for start in range(0, len(store), chunk_rows):
+        X = store.matrix(FEATURES, start, start + chunk_rows, dtype=np.float32)
+        if mule_code is not None:
+            X[:, FEATURES.index('mule_id_encoded')] = mule_code
+        chunks.append(model.predict(X))
+    return np.vstack(chunks)
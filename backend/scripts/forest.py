@@ -0,0 +1,165 @@
+import os
+import json
+import shutil
+import argparse
+import numpy as np
+
+# --- CONFIG ---
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/model_next_loc.pkl')
+
+# Bump whenever the array layout changes
+FOREST_FORMAT = 1
+ARRAYS = ['feature', 'threshold', 'children', 'value', 'roots']
+
+def compiled_path(model_path):
+    """model_next_loc.pkl -> model_next_loc.forest/"""
+    return os.path.splitext(model_path)[0] + '.forest'
+
+def is_forest(model):
+    """True for a fitted RandomForestRegressor-style ensemble (what compile_forest accepts)"""
+    estimators = getattr(model, 'estimators_', None)
+    return bool(estimators) and all(hasattr(est, 'tree_') for est in estimators)
+
+def compile_forest(model):
+    """
+    Flatten a fitted RandomForestRegressor into contiguous arrays.
+    All trees are concatenated into one node table:
+      feature   (n_nodes,)          int32   split feature, 0 on leaves
+      threshold (n_nodes,)          float64 go left if x <= threshold, +inf on leaves
+      children  (n_nodes, 2)        int32   global [left, right] node index, a leaf points to itself
+      value     (n_nodes, n_out)    float64 node prediction
+      roots     (n_trees,)          int32   root node of every tree
+    Leaves point to themselves with a threshold no x exceeds, so a (tree, row) pair
+    that already reached its leaf stays there whatever step it is given.
+    """
+    trees = [est.tree_ for est in model.estimators_]
+    sizes = np.array([t.node_count for t in trees])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    feature, threshold, children, value = [], [], [], []
+    for tree, offset in zip(trees, offsets):
+        leaf = tree.children_left == -1
+        own = np.arange(tree.node_count) + offset
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(np.where(leaf, np.inf, tree.threshold))
+        children.append(np.column_stack([
+            np.where(leaf, own, tree.children_left + offset),
+            np.where(leaf, own, tree.children_right + offset),
+        ]))
+        value.append(tree.value[:, :, 0])
+
+    arrays = {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'children': np.concatenate(children).astype(np.int32),
+        'value': np.ascontiguousarray(np.concatenate(value), dtype=np.float64),
+        'roots': offsets.astype(np.int32),
+    }
+    meta = {
+        'format': FOREST_FORMAT,
+        'n_trees': len(trees),
+        'n_nodes': int(sizes.sum()),
+        'n_features': int(model.n_features_in_),
+        'n_outputs': int(model.n_outputs_),
+        'max_depth': int(max(t.max_depth for t in trees)),
+    }
+    return arrays, meta
+
+def save_compiled(model, path):
+    """Write the compiled forest as one .npy per array plus meta.json, replacing `path` atomically"""
+    arrays, meta = compile_forest(model)
+    building = path + '.building'
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+    for name, array in arrays.items():
+        np.save(os.path.join(building, f"{name}.npy"), array)
+    with open(os.path.join(building, 'meta.json'), 'w') as f:  # written last: marks a complete forest
+        json.dump(meta, f, indent=2)
+    # A directory cannot be os.replace'd over a non-empty one: move the old one aside first
+    old = path + '.old'
+    if os.path.exists(path):
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(path, old)
+    os.replace(building, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+class CompiledForest:
+    """
+    Pure-NumPy batched predictor over the arrays written by save_compiled.
+    Every (tree, row) pair still inside a tree walks down one level per step, all
+    in one vectorised operation; pairs that reach a leaf drop out of the next step.
+    Outputs are identical to the sklearn forest: same float32 inputs compared
+    against the same float64 thresholds, and tree values averaged in tree order
+    like RandomForestRegressor.predict.
+
+    Loaded with mmap_mode='r' by default, so worker processes on one machine
+    share a single copy of the model through the OS page cache.
+    """
+
+    def __init__(self, path, mmap_mode='r'):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta['format'] != FOREST_FORMAT:
+            raise ValueError(f"Unsupported compiled forest format {self.meta['format']} in {path}")
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode))
+
+    def __len__(self):
+        return self.meta['n_trees']
+
+    def touch(self):
+        """Read every array once so the first requests do not pay for page faults"""
+        for name in ARRAYS:
+            np.asarray(getattr(self, name)).max()
+
+    def apply(self, X):
+        """(n_trees, n_rows) leaf node reached by every row in every tree"""
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        children = self.children.ravel()  # [left, right] of node i at 2i, 2i + 1
+        node = np.repeat(self.roots, n_rows)  # tree-major: pair p is tree p // n_rows, row p % n_rows
+        active = np.arange(node.size)
+        row_offset = (active % n_rows) * n_features
+        while active.size:
+            current = node[active]
+            go_right = flat_X[row_offset + self.feature[current]] > self.threshold[current]
+            nxt = children[2 * current + go_right]
+            node[active] = nxt
+            moving = nxt != current  # only a leaf points to itself
+            active, row_offset = active[moving], row_offset[moving]
+        return node.reshape(len(self.roots), n_rows)
+
+    def tree_votes(self, X):
+        """(n_trees, n_rows, n_outputs) prediction of every tree"""
+        return self.value[self.apply(X)]
+
+    def predict(self, X):
+        votes = self.tree_votes(X)
+        out = np.zeros(votes.shape[1:], dtype=np.float64)
+        for tree_votes in votes:  # sequential sum, same rounding as sklearn
+            out += tree_votes
+        out /= len(votes)
+        return out
+
+if __name__ == "__main__":
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Compile the pickled forest into memory-mappable arrays")
+    parser.add_argument("--model", default=MODEL_PATH, help="joblib-pickled RandomForestRegressor")
+    args = parser.parse_args()
+
+    model = joblib.load(args.model) if os.path.exists(args.model) else None
+    if model is None:
+        print("❌ Error: Model file not found. Run train_model.py first.")
+    elif not is_forest(model):
+        print("ℹ️  Not a random forest (e.g. --model hgb): served from the pickle, nothing to compile.")
+    else:
+        path = compiled_path(args.model)
+        meta = save_compiled(model, path)
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"✅ Compiled {meta['n_trees']} trees / {meta['n_nodes']:,} nodes "
+              f"(max depth {meta['max_depth']}) into {size / 1e6:.1f} MB")
+        print(f"📂 Saved to: {path}")
@@ -1,14 +1,60 @@
 import sqlite3
 import pandas as pd
+import numpy as np
 import random
 import os
+import io
+import csv
+import time
+import argparse
+import multiprocessing
+from collections import deque
 from faker import Faker
+from faker.providers.geo import Provider as GeoProvider
 from datetime import datetime, timedelta
 
 # Initialize Faker
 fake = Faker('en_IN')
 Faker.seed(42)
 
+# --- PATTERN 1: The Delhi ATM Gang (For Prediction Demo) ---
+DELHI_ATMS = [
+    {"id": "ATM_DEL_01", "lat": 28.6315, "long": 77.2167, "loc": "Connaught Place Block A"},
+    {"id": "ATM_DEL_02", "lat": 28.6290, "long": 77.2190, "loc": "Connaught Place Block B"},
+    {"id": "ATM_DEL_03", "lat": 28.6320, "long": 77.2200, "loc": "Barakhamba Road"}
+]
+DELHI_MULES = ['MULE_RINGLEADER_01', 'MULE_RINGLEADER_02']
+
+# --- PATTERN 2: The Bangalore Phishing Ring (For Heatmap Demo) ---
+BLR_LAT_BASE = 12.9716
+BLR_LONG_BASE = 77.5946
+
+NOISE_FRAUD_TYPES = ["Job Scam", "Lottery Fraud", "Matrimonial Scam"]
+
+# Effective mix of the classic generator: 20% Delhi, then 30% of the remaining 80%
+# Bangalore, the rest noise
+DEFAULT_MIX = (0.20, 0.24, 0.56)
+
+COLUMNS = ['id', 'complaint_id', 'fraud_type', 'amount', 'mule_account_id', 'withdrawal_atm_id',
+           'withdrawal_lat', 'withdrawal_long', 'location_name', 'timestamp', 'status']
+
+# Connection settings for bulk loads: a big page cache and in-memory temp tables
+BULK_LOAD_PRAGMAS = (
+    "PRAGMA cache_size=-262144",
+    "PRAGMA temp_store=MEMORY",
+)
+# ...and, only for a database file this run creates: no rollback journal, no fsync.
+# A crash mid-load can corrupt the file, which is only acceptable if it held nothing.
+NEW_DB_PRAGMAS = (
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA locking_mode=EXCLUSIVE",
+)
+
+def apply_bulk_pragmas(conn, new_db):
+    for pragma in BULK_LOAD_PRAGMAS + (NEW_DB_PRAGMAS if new_db else ()):
+        conn.execute(pragma)
+
 def get_database_path():
     """
     Dynamically finds the 'backend' folder and creates a 'data' folder inside it.
@@ -37,8 +83,7 @@ def create_connection(db_file):
         print(f"❌ Error connecting to database: {e}")
     return conn
 
-def create_table(conn):
-    sql_create_table = """
+SQL_CREATE_TABLE = """
     CREATE TABLE IF NOT EXISTS complaints (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         complaint_id TEXT NOT NULL,
@@ -53,27 +98,28 @@ def create_table(conn):
         status TEXT
     );
     """
+
+# Covering index for the training pipeline's (mule, time) scan (features.build_feature_store),
+# built once the rows are in: the trainer opens the database read-only and never adds it
+SQL_CREATE_SEQUENCE_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_complaints_mule_ts
+    ON complaints (mule_account_id, timestamp, id, withdrawal_lat, withdrawal_long, fraud_type)
+    """
+
+def create_table(conn):
     try:
         c = conn.cursor()
-        c.execute(sql_create_table)
+        c.execute(SQL_CREATE_TABLE)
         print("✅ Table 'complaints' created.")
     except Exception as e:
         print(e)
 
 def generate_data(conn, num_rows=2000):
     data = []
-    
-    # --- PATTERN 1: The Delhi ATM Gang (For Prediction Demo) ---
-    delhi_atms = [
-        {"id": "ATM_DEL_01", "lat": 28.6315, "long": 77.2167, "loc": "Connaught Place Block A"},
-        {"id": "ATM_DEL_02", "lat": 28.6290, "long": 77.2190, "loc": "Connaught Place Block B"},
-        {"id": "ATM_DEL_03", "lat": 28.6320, "long": 77.2200, "loc": "Barakhamba Road"}
-    ]
-    delhi_mules = ['MULE_RINGLEADER_01', 'MULE_RINGLEADER_02']
-
-    # --- PATTERN 2: The Bangalore Phishing Ring (For Heatmap Demo) ---
-    blr_lat_base = 12.9716
-    blr_long_base = 77.5946
+    delhi_atms = DELHI_ATMS
+    delhi_mules = DELHI_MULES
+    blr_lat_base = BLR_LAT_BASE
+    blr_long_base = BLR_LONG_BASE
     
     print("⏳ Generating synthetic data...")
 
@@ -107,7 +153,7 @@ def generate_data(conn, num_rows=2000):
             lng = float(loc[1])
             loc_name = f"{loc[2]}, India"
             atm_id = f"ATM_GEN_{random.randint(10000,99999)}"
-            fraud = random.choice(["Job Scam", "Lottery Fraud", "Matrimonial Scam"])
+            fraud = random.choice(NOISE_FRAUD_TYPES)
             amt = random.randint(1000, 100000)
 
         event_time = fake.date_time_this_year()
@@ -127,9 +173,387 @@ def generate_data(conn, num_rows=2000):
     conn.commit()
     print(f"✅ Successfully inserted {num_rows} rows.")
 
+# ==================== BULK MODE ====================
+
+def _india_coords():
+    """Faker's Indian land coordinates (what local_latlng(country_code='IN') samples from) as arrays"""
+    coords = [c for c in GeoProvider.land_coords if c[3] == 'IN']
+    lats = np.array([float(c[0]) for c in coords])
+    lngs = np.array([float(c[1]) for c in coords])
+    names = np.array([f"{c[2]}, India" for c in coords], dtype=object)
+    return lats, lngs, names
+
+IN_LATS, IN_LNGS, IN_NAMES = _india_coords()
+
+def generate_batch(batch_index, start_id, size, seed, mix, start_ts, end_ts):
+    """
+    Build one batch of complaints with NumPy instead of a per-row Python loop.
+    The batch only depends on (seed, batch_index), never on which worker runs it,
+    so a run is reproducible for a given seed and batch size.
+    Returns a list of row tuples in COLUMNS order.
+    """
+    rng = np.random.default_rng([seed, batch_index])
+    pattern = rng.choice(3, size=size, p=mix)  # 0 = Delhi gang, 1 = Bangalore, 2 = noise
+    delhi, blr, noise = pattern == 0, pattern == 1, pattern == 2
+
+    lat = np.empty(size)
+    lng = np.empty(size)
+    amount = np.empty(size, dtype=np.int64)
+    mule = np.empty(size, dtype=object)
+    atm = np.empty(size, dtype=object)
+    loc = np.empty(size, dtype=object)
+    fraud = np.empty(size, dtype=object)
+
+    # Pattern 1: Delhi ATM gang
+    n = int(delhi.sum())
+    atm_idx = rng.integers(0, len(DELHI_ATMS), n)
+    lat[delhi] = np.array([a["lat"] for a in DELHI_ATMS])[atm_idx] + rng.uniform(-0.0005, 0.0005, n)
+    lng[delhi] = np.array([a["long"] for a in DELHI_ATMS])[atm_idx] + rng.uniform(-0.0005, 0.0005, n)
+    atm[delhi] = np.array([a["id"] for a in DELHI_ATMS], dtype=object)[atm_idx]
+    loc[delhi] = np.array([a["loc"] for a in DELHI_ATMS], dtype=object)[atm_idx]
+    mule[delhi] = np.array(DELHI_MULES, dtype=object)[rng.integers(0, len(DELHI_MULES), n)]
+    fraud[delhi] = "Investment Scam"
+    amount[delhi] = rng.integers(50000, 500000, n, endpoint=True)
+
+    # Pattern 2: Bangalore phishing cluster
+    n = int(blr.sum())
+    lat[blr] = BLR_LAT_BASE + rng.uniform(-0.02, 0.02, n)
+    lng[blr] = BLR_LONG_BASE + rng.uniform(-0.02, 0.02, n)
+    mule[blr] = np.char.add("MULE_BLR_", rng.integers(100, 999, n, endpoint=True).astype(str)).astype(object)
+    atm[blr] = np.char.add("ATM_BLR_", rng.integers(1000, 9999, n, endpoint=True).astype(str)).astype(object)
+    loc[blr] = "Bangalore Urban"
+    fraud[blr] = "UPI Phishing"
+    amount[blr] = rng.integers(2000, 20000, n, endpoint=True)
+
+    # Pattern 3: random noise across India
+    n = int(noise.sum())
+    place = rng.integers(0, len(IN_LATS), n)
+    lat[noise] = IN_LATS[place]
+    lng[noise] = IN_LNGS[place]
+    loc[noise] = IN_NAMES[place]
+    mule[noise] = np.char.add("MULE_RAND_", rng.integers(1000, 9999, n, endpoint=True).astype(str)).astype(object)
+    atm[noise] = np.char.add("ATM_GEN_", rng.integers(10000, 99999, n, endpoint=True).astype(str)).astype(object)
+    fraud[noise] = np.array(NOISE_FRAUD_TYPES, dtype=object)[rng.integers(0, len(NOISE_FRAUD_TYPES), n)]
+    amount[noise] = rng.integers(1000, 100000, n, endpoint=True)
+
+    ids = np.arange(start_id, start_id + size)
+    complaint_ids = np.char.add("CMP", (ids + 9999).astype(str))  # id 1 -> CMP10000, as in classic mode
+    seconds = rng.integers(start_ts, end_ts, size).astype('datetime64[s]')
+    timestamps = np.char.replace(np.datetime_as_string(seconds), 'T', ' ')
+
+    return list(zip(
+        ids.tolist(), complaint_ids.tolist(), fraud.tolist(), amount.tolist(), mule.tolist(), atm.tolist(),
+        np.round(lat, 6).tolist(), np.round(lng, 6).tolist(), loc.tolist(), timestamps.tolist(),
+        ["Open"] * size
+    ))
+
+class _Exporter:
+    """Streams batches to CSV or Parquet alongside the SQLite load"""
+
+    def __init__(self, path, header=True):
+        self.path = path
+        self.kind = 'parquet' if path.endswith('.parquet') else 'csv'
+        if self.kind == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SystemExit("❌ Parquet export needs pyarrow: pip install pyarrow")
+            self._pa = pa
+            self._writer = pq.ParquetWriter(path, pa.schema([
+                ('id', pa.int64()), ('complaint_id', pa.string()), ('fraud_type', pa.string()),
+                ('amount', pa.int64()), ('mule_account_id', pa.string()), ('withdrawal_atm_id', pa.string()),
+                ('withdrawal_lat', pa.float64()), ('withdrawal_long', pa.float64()),
+                ('location_name', pa.string()), ('timestamp', pa.string()), ('status', pa.string()),
+            ]))
+        else:
+            self._file = open(path, 'w', newline='')
+            self._writer = csv.writer(self._file)
+            if header:
+                self._writer.writerow(COLUMNS)
+
+    def write(self, rows, csv_text=None):
+        if csv_text is not None:
+            self._file.write(csv_text)
+        elif self.kind == 'parquet':
+            columns = list(zip(*rows))
+            self._writer.write_table(self._pa.Table.from_arrays(
+                [self._pa.array(c) for c in columns], schema=self._writer.schema))
+        else:
+            self._writer.writerows(rows)
+
+    def copy_table(self, conn, chunk_rows=100_000):
+        """Write the rows already in `conn`'s complaints table, so the export covers the whole table"""
+        cur = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM complaints ORDER BY id")
+        while rows := cur.fetchmany(chunk_rows):
+            self.write(rows)
+
+    def append_file(self, path):
+        """Copy a shard's export (headerless CSV or Parquet file) onto the end of this one"""
+        if self.kind == 'parquet':
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(path).iter_batches():
+                self._writer.write_table(self._pa.Table.from_batches([batch]))
+        else:
+            with open(path, newline='') as shard:
+                while chunk := shard.read(1 << 20):
+                    self._file.write(chunk)
+
+    def close(self):
+        if self.kind == 'parquet':
+            self._writer.close()
+        else:
+            self._file.close()
+
+SQL_INSERT = f"INSERT INTO complaints ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+def _normalise_mix(mix):
+    mix = np.asarray(mix, dtype=float)
+    return mix / mix.sum()
+
+def _time_window(until=None):
+    """
+    Same window as fake.date_time_this_year(), pinned to midnight so a seed is repeatable
+    within a day (pass `until` to pin it for good). Epoch seconds are computed from naive
+    datetimes, so the result does not depend on the machine's timezone.
+    """
+    end = until or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = datetime(end.year, 1, 1)
+    epoch = datetime(1970, 1, 1)
+    start_ts = int((start - epoch).total_seconds())
+    end_ts = max(int((end - epoch).total_seconds()), start_ts + 1)
+    return start_ts, end_ts
+
+def _batch_tasks(first_id, num_rows, batch_size, seed, mix, window):
+    """generate_batch arguments for `num_rows` rows starting at `first_id`"""
+    n_batches = (num_rows + batch_size - 1) // batch_size
+    return [
+        (b, first_id + b * batch_size, min(batch_size, num_rows - b * batch_size), seed, mix, *window)
+        for b in range(n_batches)
+    ]
+
+def _insert_batch(conn, rows):
+    conn.execute("BEGIN")
+    conn.executemany(SQL_INSERT, rows)
+    conn.execute("COMMIT")
+
+def _generate_batch_task(args, format_csv=False):
+    """Worker entry point; also renders the batch's CSV text so the writer process only does I/O"""
+    rows = generate_batch(*args)
+    if not format_csv:
+        return rows, None
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return rows, buffer.getvalue()
+
+def _open_export(conn, export_path, first_id):
+    """Exporter for `export_path`, already holding the rows the table had before this run"""
+    if not export_path:
+        return None
+    exporter = _Exporter(export_path)
+    if first_id > 1:
+        exporter.copy_table(conn)
+    return exporter
+
+def generate_data_bulk(conn, num_rows, seed=42, workers=1, mix=DEFAULT_MIX, batch_size=100_000,
+                       export_path=None, until=None, new_db=False):
+    """
+    Scalable generator: NumPy-vectorised batches of `batch_size` rows, generated by
+    `workers` processes and streamed into SQLite one transaction per batch, with the
+    CSV/Parquet export written in the same pass. Memory stays at a few batches.
+    The export holds the whole table: rows from earlier runs are copied in first.
+    `new_db`: the file was created by this run, so journaling and fsync can be off.
+    """
+    mix = _normalise_mix(mix)
+    first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM complaints").fetchone()[0] + 1
+    tasks = _batch_tasks(first_id, num_rows, batch_size, seed, mix, _time_window(until))
+    n_batches = len(tasks)
+
+    apply_bulk_pragmas(conn, new_db)
+    exporter = _open_export(conn, export_path, first_id)
+    format_csv = exporter is not None and exporter.kind == 'csv'
+
+    print(f"⏳ Generating {num_rows:,} rows in {n_batches} batches with {workers} worker(s)...")
+    started = time.perf_counter()
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    try:
+        # Keep at most 2 batches per worker in flight so memory does not grow with num_rows
+        pending = deque()
+        task_iter = iter(tasks)
+        written = 0
+        while True:
+            while len(pending) < max(2 * workers, 1):
+                task = next(task_iter, None)
+                if task is None:
+                    break
+                pending.append(pool.apply_async(_generate_batch_task, (task, format_csv)) if pool else task)
+            if not pending:
+                break
+            head = pending.popleft()
+            rows, csv_text = head.get() if pool else _generate_batch_task(head, format_csv)
+
+            _insert_batch(conn, rows)
+            if exporter:
+                exporter.write(rows, csv_text)
+            written += len(rows)
+            elapsed = time.perf_counter() - started
+            print(f"   {written:>12,} rows  ({written / elapsed:,.0f} rows/s)")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if exporter:
+            exporter.close()
+
+    print(f"✅ Successfully inserted {written:,} rows in {time.perf_counter() - started:.1f}s.")
+    if export_path:
+        print(f"✅ Export written to: {export_path}")
+
+def shard_seeds(seed, shards):
+    """Independent per-shard seeds derived from the run seed (same seed + shard count -> same seeds)"""
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(shards)]
+
+def shard_ranges(first_id, num_rows, shards):
+    """Split `num_rows` ids starting at `first_id` into `shards` contiguous (first_id, rows) ranges"""
+    base, extra = divmod(num_rows, shards)
+    ranges = []
+    for k in range(shards):
+        rows = base + (1 if k < extra else 0)
+        ranges.append((first_id, rows))
+        first_id += rows
+    return ranges
+
+def _shard_path(path, k):
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{k:03d}{ext}"
+
+def generate_shard(shard_index, shard_seed, first_id, num_rows, db_path, batch_size, mix, window,
+                   export_path=None):
+    """
+    Worker entry point for sharded generation: writes complaint ids
+    [first_id, first_id + num_rows) to its own SQLite file (and export file).
+    Output depends only on the arguments, never on scheduling.
+    """
+    shard_db = _shard_path(db_path, shard_index)
+    if os.path.exists(shard_db):
+        os.remove(shard_db)
+    conn = sqlite3.connect(shard_db, isolation_level=None)
+    conn.execute(SQL_CREATE_TABLE)
+    apply_bulk_pragmas(conn, new_db=True)  # a scratch file: a crash only loses this run
+    shard_export = _shard_path(export_path, shard_index) if export_path else None
+    exporter = _Exporter(shard_export, header=False) if shard_export else None
+    format_csv = exporter is not None and exporter.kind == 'csv'
+    try:
+        for task in _batch_tasks(first_id, num_rows, batch_size, shard_seed, mix, window):
+            rows, csv_text = _generate_batch_task(task, format_csv)
+            _insert_batch(conn, rows)
+            if exporter:
+                exporter.write(rows, csv_text)
+    finally:
+        conn.close()
+        if exporter:
+            exporter.close()
+    return shard_db, shard_export
+
+def _generate_shard_task(args):
+    return generate_shard(*args)
+
+def generate_data_sharded(conn, db_path, num_rows, seed=42, shards=4, workers=None, mix=DEFAULT_MIX,
+                          batch_size=100_000, export_path=None, until=None, keep_shards=False, new_db=False):
+    """
+    Deterministic parallel generation: shard k gets seed shard_seeds(seed, shards)[k] and a
+    contiguous id range, and each worker process writes its shard to a separate file with no
+    shared writer. Shards are then appended to the main DB (ATTACH + INSERT ... SELECT) and
+    export in shard order, so the result is bit-identical for a given seed and shard count
+    (pin --until to make it identical across days as well). Export and `new_db` as in
+    generate_data_bulk.
+    """
+    workers = workers or shards
+    mix = _normalise_mix(mix)
+    window = _time_window(until)
+    first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM complaints").fetchone()[0] + 1
+    tasks = [
+        (k, shard_seed, shard_first_id, shard_rows, db_path, batch_size, mix, window, export_path)
+        for k, (shard_seed, (shard_first_id, shard_rows))
+        in enumerate(zip(shard_seeds(seed, shards), shard_ranges(first_id, num_rows, shards)))
+    ]
+
+    print(f"⏳ Generating {num_rows:,} rows in {shards} shards with {workers} worker(s)...")
+    started = time.perf_counter()
+    if workers > 1:
+        with multiprocessing.Pool(min(workers, shards)) as pool:
+            outputs = pool.map(_generate_shard_task, tasks, chunksize=1)
+    else:
+        outputs = [_generate_shard_task(task) for task in tasks]
+    print(f"   shards written in {time.perf_counter() - started:.1f}s, merging...")
+
+    apply_bulk_pragmas(conn, new_db)
+    exporter = _open_export(conn, export_path, first_id)
+    try:
+        for shard_db, shard_export in outputs:
+            conn.execute("ATTACH DATABASE ? AS shard", (shard_db,))
+            conn.execute("BEGIN")
+            conn.execute(f"INSERT INTO complaints ({', '.join(COLUMNS)}) SELECT {', '.join(COLUMNS)} FROM shard.complaints ORDER BY id")
+            conn.execute("COMMIT")
+            conn.execute("DETACH DATABASE shard")
+            if exporter:
+                exporter.append_file(shard_export)
+            if not keep_shards:
+                os.remove(shard_db)
+                if shard_export:
+                    os.remove(shard_export)
+    finally:
+        if exporter:
+            exporter.close()
+
+    print(f"✅ Successfully inserted {num_rows:,} rows in {time.perf_counter() - started:.1f}s.")
+    if export_path:
+        print(f"✅ Export written to: {export_path}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic cybercrime complaints")
+    parser.add_argument("--bulk", action="store_true",
+                        help="vectorised, batched generator for large load-test datasets")
+    parser.add_argument("--rows", type=int, default=2000, help="number of complaints to generate")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="generator processes (bulk mode; default 1, or one per shard)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="write N independently seeded shard files in parallel, then merge; "
+                             "output is bit-identical for a given --seed, --shards and --until (bulk mode)")
+    parser.add_argument("--keep-shards", action="store_true", help="keep the per-shard files after merging")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="rows per batch/transaction (bulk mode; default 100000)")
+    parser.add_argument("--mix", default=None,
+                        help="Delhi gang,Bangalore cluster,noise proportions (bulk mode; default "
+                             f"{','.join(str(p) for p in DEFAULT_MIX)})")
+    parser.add_argument("--export", default=None,
+                        help="CSV or .parquet export path (default: crime_data.csv next to the DB)")
+    parser.add_argument("--no-export", action="store_true", help="skip the CSV/Parquet export")
+    parser.add_argument("--until", type=lambda s: datetime.strptime(s, "%Y-%m-%d"), default=None,
+                        help="end of the timestamp window, YYYY-MM-DD (bulk mode; default today)")
+    parser.add_argument("--db", default=None, help="SQLite path (default backend/data/crime_data.db)")
+    args = parser.parse_args()
+    # The classic generator would silently ignore these: fail instead of pretending to shard
+    if not args.bulk:
+        given = [flag for flag, value in (("--workers", args.workers), ("--shards", args.shards),
+                                          ("--keep-shards", args.keep_shards), ("--until", args.until),
+                                          ("--batch-size", args.batch_size), ("--mix", args.mix)) if value]
+        if given:
+            parser.error(f"{', '.join(given)}: bulk mode only, add --bulk")
+    if args.keep_shards and not args.shards:
+        parser.error("--keep-shards: needs --shards")
+    args.batch_size = args.batch_size or 100_000
+    args.mix = args.mix or ",".join(str(p) for p in DEFAULT_MIX)
+    return args
+
 if __name__ == "__main__":
+    args = parse_args()
+
     # 1. Get correct path (backend/data/crime_data.db)
-    db_path = get_database_path()
+    db_path = args.db or get_database_path()
+    csv_path = None if args.no_export else (args.export or db_path.replace('.db', '.csv'))
+    new_db = not os.path.exists(db_path)
     
     # 2. Connect
     conn = create_connection(db_path)
@@ -137,14 +561,32 @@ if __name__ == "__main__":
     if conn is not None:
         # 3. Create Table & Generate Data
         create_table(conn)
-        generate_data(conn)
-        
-        # 4. Optional: Save CSV backup in the same folder
-        csv_path = db_path.replace('.db', '.csv')
-        db_df = pd.read_sql_query("SELECT * FROM complaints", conn)
-        db_df.to_csv(csv_path, index=False)
-        print(f"✅ Backup CSV created at: {csv_path}")
-        
+        if args.bulk:
+            mix = [float(p) for p in args.mix.split(",")]
+            if len(mix) != 3:
+                raise SystemExit("❌ --mix needs three proportions: delhi,bangalore,noise")
+            # Export is streamed during generation, no read-back
+            if args.shards > 0:
+                generate_data_sharded(conn, db_path, args.rows, seed=args.seed, shards=args.shards,
+                                      workers=args.workers, mix=mix, batch_size=args.batch_size,
+                                      export_path=csv_path, until=args.until, keep_shards=args.keep_shards,
+                                      new_db=new_db)
+            else:
+                generate_data_bulk(conn, args.rows, seed=args.seed, workers=args.workers or 1, mix=mix,
+                                   batch_size=args.batch_size, export_path=csv_path, until=args.until,
+                                   new_db=new_db)
+        else:
+            random.seed(args.seed)
+            generate_data(conn, args.rows)
+            
+            # 4. Optional: Save CSV backup in the same folder
+            if csv_path:
+                db_df = pd.read_sql_query("SELECT * FROM complaints", conn)
+                db_df.to_csv(csv_path, index=False)
+                print(f"✅ Backup CSV created at: {csv_path}")
+
+        conn.execute(SQL_CREATE_SEQUENCE_INDEX)
+        conn.commit()
         conn.close()
     else:
         print("Error! Cannot create the database connection.")
\ No newline at end of file
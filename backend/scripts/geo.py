@@ -0,0 +1,17 @@
+import numpy as np
+
+EARTH_RADIUS_M = 6371 * 1000 # Radius of earth in meters
+
+def haversine(lon1, lat1, lon2, lat2):
+    """
+    Great circle distance in meters between points given in decimal degrees.
+    Vectorised: every argument may be a scalar or a NumPy array (broadcast
+    together), so a whole prediction set is scored in one array operation.
+    """
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+
+    # haversine formula
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+import numpy as np
+
+# --- CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, '../data/crime_data.db')
+DEFAULT_URL = 'http://127.0.0.1:8000'
+
+def sample_payloads(n, seed=42, unseen_fraction=0.0):
+    """
+    Real withdrawals from the training DB. A random `unseen_fraction` of them get a
+    mule id the model has never seen, to exercise the unknown-mule path.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(
+            "SELECT mule_account_id, withdrawal_lat, withdrawal_long, timestamp "
+            "FROM complaints ORDER BY RANDOM() LIMIT ?", (n,)
+        ).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        raise SystemExit("❌ Error: No complaints found. Run generate_data.py first.")
+    rng = np.random.default_rng(seed)
+    unseen = rng.random(n) < unseen_fraction
+    return [
+        {'mule_id': f"MULE_NEW_{j:06d}" if unseen[j] else r[0],
+         'lat': r[1], 'long': r[2], 'timestamp': r[3].replace(' ', 'T'), 'k': 3}
+        for j, r in enumerate(rows[i] for i in rng.integers(0, len(rows), n))
+    ]
+
+async def worker(client, queue, latencies, server_latencies, errors, versions):
+    while True:
+        try:
+            payload = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        response = await client.post('/predict', json=payload)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code == 200:
+            body = response.json()
+            server_latencies[body.get('mule_known', True)].append(body['latency_ms'] / 1000)
+            versions[body.get('model_version')] += 1
+        else:
+            errors.append(response.status_code)
+
+async def run(client, payloads, concurrency):
+    queue = asyncio.Queue()
+    for p in payloads:
+        queue.put_nowait(p)
+    latencies, server_latencies, errors, versions = [], defaultdict(list), [], Counter()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(client, queue, latencies, server_latencies, errors, versions)
+                           for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, server_latencies, errors, versions
+
+def report(label, values):
+    ms = np.asarray(values) * 1000
+    print(f"   {label:<22} p50 {np.percentile(ms, 50):7.2f} ms   p99 {np.percentile(ms, 99):7.2f} ms   max {ms.max():7.2f} ms")
+
+async def load_test(args):
+    payloads = sample_payloads(args.requests + args.warmup, unseen_fraction=args.unseen_fraction)
+    if args.in_process:
+        # Drive the ASGI app directly: measures the service, not the network stack
+        sys.path.append(os.path.join(BASE_DIR, '../..'))
+        from backend.main import app
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url='http://load-test') as client:
+                return await _measure(client, payloads, args)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        return await _measure(client, payloads, args)
+
+async def _measure(client, payloads, args):
+    await run(client, payloads[:args.warmup], args.concurrency)
+    elapsed, latencies, server_latencies, errors, versions = await run(client, payloads[args.warmup:], args.concurrency)
+
+    print(f"\n📊 --- LOAD TEST: POST /predict ---")
+    print(f"   Requests:    {len(latencies)} ({len(errors)} errors) at concurrency {args.concurrency}")
+    print(f"   Throughput:  {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"   Models:      {dict(versions)}")  # more than one: a hot swap happened mid-test
+    report('End-to-end latency', latencies)
+    all_server = [t for path in server_latencies.values() for t in path]
+    if all_server:
+        report('Server latency', all_server)
+    for known, label in ((True, '  seen mules'), (False, '  unseen mules')):
+        if server_latencies.get(known) and len(server_latencies) > 1:
+            report(f"{label} ({len(server_latencies[known])})", server_latencies[known])
+    stats = (await client.get('/predict/stats')).json()
+    if stats.get('batches'):
+        print(f"\n📦 Micro-batching (window {stats['window_ms']} ms, max batch {stats['max_batch']}):")
+        print(f"   Mean batch size: {stats['mean_batch_size']} over {stats['batches']} batches")
+        print(f"   Batch sizes:     {stats['batch_size_histogram']}")
+        print(f"   Queue delay:     {stats['queue_delay_ms']}")
+        print(f"   Batch time:      {stats['batch_time_ms']}")
+    if all_server:
+        p99 = np.percentile(all_server, 99) * 1000
+        print(f"\n{'✅' if p99 < 10 else '⚠️'} Server p99 {p99:.2f} ms (budget 10 ms)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load test the next-location prediction endpoint')
+    parser.add_argument('--url', default=DEFAULT_URL, help='base URL of a running server')
+    parser.add_argument('--in-process', action='store_true', help='call backend.main.app through ASGI instead of HTTP')
+    parser.add_argument('--requests', type=int, default=2000, help='measured requests')
+    parser.add_argument('--warmup', type=int, default=100, help='unmeasured warm-up requests')
+    parser.add_argument('--concurrency', type=int, default=16, help='requests in flight')
+    parser.add_argument('--unseen-fraction', type=float, default=0.0, help='share of requests for never-seen mules')
+    asyncio.run(load_test(parser.parse_args()))
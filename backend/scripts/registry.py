@@ -0,0 +1,133 @@
+import os
+import json
+import shutil
+import joblib
+from datetime import datetime
+
+from features import FEATURES, TARGETS, encoder_hash, feature_schema_hash
+from forest import is_forest, save_compiled
+
+# --- CONFIG ---
+REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/models')
+
+# Layout of the registry:
+#   models/
+#     CURRENT            name of the live version (replaced atomically)
+#     v0001/
+#       model.pkl        sklearn model (incremental training continues from a forest)
+#       forest/          compiled, memory-mappable copy served by the API (forest backend only)
+#       encoder.pkl      MuleEncoder
+#       atms/            ATM catalog the predictions are snapped to (optional)
+#       metadata.json    watermark, feature schema hash, verify metrics (written last)
+#     v0002/ ...
+CURRENT_FILE = 'CURRENT'
+METADATA_FILE = 'metadata.json'
+
+def version_path(version, root=REGISTRY_DIR):
+    return os.path.join(root, version)
+
+def list_versions(root=REGISTRY_DIR):
+    """Complete versions, oldest first (a version without metadata.json is still being written)"""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if name.startswith('v') and os.path.exists(os.path.join(root, name, METADATA_FILE))
+    )
+
+def current_version(root=REGISTRY_DIR):
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def load_metadata(version, root=REGISTRY_DIR):
+    with open(os.path.join(version_path(version, root), METADATA_FILE)) as f:
+        return json.load(f)
+
+def _write_json(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+def set_current(version, root=REGISTRY_DIR):
+    """Point CURRENT at `version`; readers see either the old or the new name, never a partial write"""
+    tmp = os.path.join(root, CURRENT_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+def publish(model, encoder, watermark, catalog=None, root=REGISTRY_DIR, keep=5, make_current=True):
+    """
+    Add a new version holding `model` + `encoder` and (by default) make it current.
+    Everything is written into a hidden directory that is renamed into place when
+    complete, so a watcher never sees a half-written version.
+    Returns the new version name.
+    """
+    os.makedirs(root, exist_ok=True)
+    building = os.path.join(root, f".building-{os.getpid()}")
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+
+    joblib.dump(model, os.path.join(building, 'model.pkl'))
+    # Boosted models are served from model.pkl
+    forest_meta = save_compiled(model, os.path.join(building, 'forest')) if is_forest(model) else None
+    joblib.dump(encoder, os.path.join(building, 'encoder.pkl'))
+    if catalog is not None:
+        catalog.save(os.path.join(building, 'atms'))
+
+    existing = [name for name in os.listdir(root) if name.startswith('v') and name[1:].isdigit()]
+    version = f"v{max((int(name[1:]) for name in existing), default=0) + 1:04d}"
+    metadata = {
+        'version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'feature_schema_hash': feature_schema_hash(),
+        'features': FEATURES,
+        'targets': TARGETS,
+        'encoder_hash': encoder_hash(encoder),
+        'n_mules': len(encoder),
+        'n_atms': len(catalog) if catalog is not None else 0,
+        'backend': 'forest' if forest_meta else 'hgb',
+        'forest': forest_meta,
+        'params': {k: v for k, v in model.get_params().items() if k != 'n_jobs'},
+        'watermark': watermark,
+        'metrics': None,  # filled in by verify_model.py
+    }
+    _write_json(os.path.join(building, METADATA_FILE), metadata)
+    os.rename(building, version_path(version, root))
+
+    if make_current:
+        set_current(version, root)
+    prune(root, keep)
+    return version
+
+def record_metrics(version, metrics, root=REGISTRY_DIR):
+    """Attach verify_model.py results to a version's metadata"""
+    path = os.path.join(version_path(version, root), METADATA_FILE)
+    metadata = load_metadata(version, root)
+    metadata['metrics'] = dict(metrics, verified_at=datetime.now().isoformat(timespec='seconds'))
+    _write_json(path, metadata)
+    return metadata
+
+def prune(root=REGISTRY_DIR, keep=5):
+    """Delete all but the `keep` newest versions; the current one is always kept"""
+    current = current_version(root)
+    for version in list_versions(root)[:-keep]:
+        if version != current:
+            shutil.rmtree(version_path(version, root), ignore_errors=True)
+
+if __name__ == "__main__":
+    current = current_version()
+    versions = list_versions()
+    if not versions:
+        print("❌ Registry is empty. Run train_model.py first.")
+    for version in versions:
+        meta = load_metadata(version)
+        metrics = meta['metrics'] or {}
+        error = f"{metrics['avg_error_m']:.0f} m" if 'avg_error_m' in metrics else 'not verified'
+        marker = '👉' if version == current else '  '
+        size = f"{meta['forest']['n_trees']} trees" if meta.get('forest') else meta.get('backend', '?')
+        print(f"{marker} {version}  {meta['created_at']}  {size}  "
+              f"watermark id {meta['watermark'].get('id')}  error {error}  schema {meta['feature_schema_hash']}")
@@ -1,73 +1,214 @@
 import pandas as pd
 import numpy as np
-import sqlite3
 import joblib
 import os
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
+import argparse
 from sklearn.preprocessing import LabelEncoder
 
+from features import (FEATURES, TARGETS, UNKNOWN_MULE_CODE, FeatureStore, MuleEncoder, build_training_pairs,
+                      connect_readonly, fit_encoder_streaming, open_feature_store, with_unknown_bucket)
+import registry
+import tune
+from estimators import BACKENDS, make_model
+from forest import is_forest
+from atm_catalog import AtmCatalog
+
 # --- CONFIG ---
 DB_PATH = os.path.join(os.path.dirname(__file__), '../data/crime_data.db')
 MODEL_PATH = os.path.join(os.path.dirname(__file__), '../data/model_next_loc.pkl')
 ENCODER_PATH = os.path.join(os.path.dirname(__file__), '../data/label_encoder.pkl')
+# High-watermark + last withdrawal per mule, so the next run only reads new complaints
+STATE_PATH = os.path.join(os.path.dirname(__file__), '../data/train_state.pkl')
+# History pairs replayed next to the new ones when an incremental run grows trees
+REPLAY_ROWS = 100_000
 
-def train():
-    print("⏳ Loading data from Database...")
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM complaints", conn)
-    conn.close()
-
-    # 1. PREPROCESSING
-    # Convert timestamp to datetime objects
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    
-    # Sort by Mule ID and Time (Crucial for "Next Location" logic)
-    df = df.sort_values(by=['mule_account_id', 'timestamp'])
-
-    # Create Features: Hour of day, Day of week
-    df['hour'] = df['timestamp'].dt.hour
-    df['day_of_week'] = df['timestamp'].dt.dayofweek
+def save_state(watermark_id, watermark_ts, last_by_mule, store_path=None):
+    state = {
+        'watermark_id': int(watermark_id),
+        'watermark_ts': str(watermark_ts),
+        'last_by_mule': last_by_mule,
+        'store_path': store_path,  # feature store of the last full run, sampled for replay
+    }
+    joblib.dump(state, STATE_PATH)
+    return state
 
+def train(chunk_rows=200_000, cores=None, search=False, val_fraction=0.2, backend='forest'):
+    """
+    Full training run of the `backend` model (estimators.BACKENDS), same features
+    either way. With `search`, the forest's hyperparameters and tree count
+    are first picked by tune.search (time-based split, early stopping on the
+    validation haversine error); the winner is then refit on every pattern.
+    """
+    cores = cores or os.cpu_count()
+    print("⏳ Streaming data from Database...")
+    conn = connect_readonly(DB_PATH)
     # Encode Mule IDs (AI cannot read strings like "MULE_01")
-    le = LabelEncoder()
-    df['mule_id_encoded'] = le.fit_transform(df['mule_account_id'])
-
-    # 2. CREATE TARGETS (The "Next Location" Logic)
-    # We shift the lat/long columns up by 1 row to see the "Future"
-    df['next_lat'] = df.groupby('mule_account_id')['withdrawal_lat'].shift(-1)
-    df['next_long'] = df.groupby('mule_account_id')['withdrawal_long'].shift(-1)
+    # MuleEncoder gives the same codes as LabelEncoder but can be extended later
+    le = fit_encoder_streaming(conn, chunk_rows)
+    watermark_id, watermark_ts = conn.execute("SELECT MAX(id), MAX(timestamp) FROM complaints").fetchone()
+    conn.close()
+    # Unknown-mule bucket: new mules are scored with this code instead of failing.
+    # Set before the store is opened: its key hashes the encoder as it is saved,
+    # so verify_model.py finds the same store from the saved encoder.
+    le.unknown_code = UNKNOWN_MULE_CODE
 
-    # Drop the last row of every mule (because it has no "next" location)
-    df = df.dropna(subset=['next_lat', 'next_long'])
+    # 1. PREPROCESSING + 2. CREATE TARGETS (The "Next Location" Logic)
+    # Rows are streamed in (mule, time) order in chunks; every withdrawal is paired
+    # with the mule's next one and written to an on-disk, memory-mapped feature store
+    # (the last row of every mule has no "next" location and is dropped).
+    # The store is keyed by data watermark + encoder, so verify_model.py reuses it.
+    store = open_feature_store(DB_PATH, le, chunk_rows=chunk_rows)
+    last_by_mule = store.last_by_mule()
 
     # 3. DEFINE INPUTS (X) AND OUTPUTS (Y)
-    features = ['mule_id_encoded', 'withdrawal_lat', 'withdrawal_long', 'hour', 'day_of_week']
-    targets = ['next_lat', 'next_long']
-
-    X = df[features]
-    y = df[targets]
+    # float32 is what the trees use internally, so this is the only full copy in RAM
+    X = store.matrix(FEATURES, dtype=np.float32)
+    y = store.matrix(TARGETS)
+    X_train, y_train = with_unknown_bucket(X, y)
 
     # 4. TRAIN MODEL
-    print(f"🧠 Training Random Forest on {len(df)} patterns...")
-    # n_estimators=100 means we use 100 "Decision Trees" voting together
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(X, y)
+    params = {}
+    if search:
+        trials = tune.search(store, cores, val_fraction)
+        best = trials.iloc[0]
+        params = {'n_estimators': int(best['trees'])}
+        params.update(tune.parameter_grid()[int(best['trial'])])  # the table's cells are NaN/float-coerced
+        print(f"\n📋 Trials (best first), saved to {tune.TRIALS_PATH}:")
+        print(trials.to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+        print(f"🏆 Best: {params}  validation error {best['val_error_m']:.0f} m")
+    print(f"🧠 Training {backend} model on {len(store)} patterns (+{len(X_train) - len(X)} unknown-mule) "
+          f"with {cores} core(s)...")
+    model = make_model(backend, cores, **params)
+    model.fit(X_train, y_train)
+    model.n_jobs = None  # don't carry the training core count into serving/incremental runs
 
     # 5. SAVE EVERYTHING
     joblib.dump(model, MODEL_PATH)
     joblib.dump(le, ENCODER_PATH) # Save the name translator too
+    state = save_state(watermark_id, watermark_ts, last_by_mule, store.path)
+    # New registry version: the running API picks it up without a restart
+    version = registry.publish(model, le, {'id': state['watermark_id'], 'ts': state['watermark_ts'], 'rows': len(store)},
+                               catalog=AtmCatalog.from_db(DB_PATH))
+    if search:
+        registry.record_metrics(version, {
+            'source': 'time-split validation',
+            'val_fraction': val_fraction,
+            'avg_error_m': float(best['val_error_m']),
+            'median_error_m': float(best['val_p50_m']),
+        })
     
     print("✅ Model Trained & Saved Successfully!")
     print(f"📂 Saved to: {MODEL_PATH}")
+    print(f"🗃️  Registry version: {version}")
+    print(f"📌 Watermark: complaint id {state['watermark_id']}")
 
     # --- TEST THE MODEL (Optional) ---
-    sample_input = X.iloc[0:1] # Take the first real row
+    sample_input = X[0:1] # Take the first real row
     prediction = model.predict(sample_input)
     print(f"\n🔍 TEST PREDICTION:")
-    print(f"   Input Location: {X.iloc[0]['withdrawal_lat']}, {X.iloc[0]['withdrawal_long']}")
+    print(f"   Input Location: {store['withdrawal_lat'][0]}, {store['withdrawal_long'][0]}")
     print(f"   Predicted Next: {prediction[0][0]}, {prediction[0][1]}")
-    print(f"   Actual Next:    {y.iloc[0]['next_lat']}, {y.iloc[0]['next_long']}")
+    print(f"   Actual Next:    {y[0][0]}, {y[0][1]}")
+
+def replay_sample(state, le, size=REPLAY_ROWS, seed=42):
+    """
+    Random (X, y) sample of the historical pairs, from the feature store of the
+    last full run (rebuilt from the database if it has been pruned since).
+    Its mule codes stay valid: the encoder only ever appends codes.
+    """
+    path = state.get('store_path')
+    if path and os.path.exists(os.path.join(path, 'meta.json')):
+        store = FeatureStore(path)
+    else:
+        print("⚠️ Feature store of the last full run is gone, rebuilding it for the replay sample.")
+        store = open_feature_store(DB_PATH, le)
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(store), size=min(size, len(store)), replace=False))
+    return store.take(FEATURES, rows, dtype=np.float32), store.take(TARGETS, rows)
+
+def train_incremental(new_trees=10, max_trees=300, replay_rows=REPLAY_ROWS):
+    """
+    Update the model with complaints added since the last run instead of retraining.
+    - reads only rows above the id high-watermark
+    - continues every mule's sequence from its saved last withdrawal
+    - extends the encoder without renumbering existing mules
+    - warm-starts the forest: `new_trees` trees are grown and added to the
+      existing ones; the oldest trees are dropped past `max_trees`
+    The added trees vote on every prediction, so they are fit on the new pairs
+    plus a replay sample of up to `replay_rows` historical pairs: trees fit on
+    the new pairs alone would pull every prediction towards a handful of rows.
+    Cost follows the new complaints plus the replay sample, not the whole history.
+    """
+    if not all(os.path.exists(p) for p in (MODEL_PATH, ENCODER_PATH, STATE_PATH)):
+        print("⚠️ No previous model/state found, running a full training instead.")
+        return train()
+
+    model = joblib.load(MODEL_PATH)
+    if not is_forest(model):
+        print("⚠️ Incremental runs only grow forests, running a full hgb training instead.")
+        return train(backend='hgb')
+    le = joblib.load(ENCODER_PATH)
+    state = joblib.load(STATE_PATH)
+    if isinstance(le, LabelEncoder):
+        le = MuleEncoder.from_label_encoder(le)  # same codes, now appendable
+
+    print(f"⏳ Loading complaints after id {state['watermark_id']}...")
+    conn = connect_readonly(DB_PATH)
+    df = pd.read_sql_query("SELECT * FROM complaints WHERE id > ?", conn, params=(state['watermark_id'],))
+    conn.close()
+    if df.empty:
+        print("✅ Model is up to date, nothing to train.")
+        return
+
+    added = le.extend(df['mule_account_id'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    pairs, last_by_mule = build_training_pairs(df, le, state['last_by_mule'])
+    print(f"📥 {len(df)} new complaints, {added} new mules, {len(pairs)} new patterns")
+
+    if len(pairs):
+        X_replay, y_replay = replay_sample(state, le, replay_rows)
+        print(f"🧠 Growing {new_trees} trees on the new patterns + {len(X_replay)} replayed ones...")
+        model.warm_start = True
+        model.n_estimators = len(model.estimators_) + new_trees
+        X = np.vstack([pairs[FEATURES].to_numpy(np.float32), X_replay])
+        y = np.vstack([pairs[TARGETS].to_numpy(), y_replay])
+        if le.unknown_code is not None:  # keep teaching the bucket; a pre-bucket model needs one full run
+            X, y = with_unknown_bucket(X, y)
+        model.fit(X, y)
+        if len(model.estimators_) > max_trees:
+            model.estimators_ = model.estimators_[-max_trees:]
+            model.n_estimators = max_trees
+        joblib.dump(model, MODEL_PATH)
+
+    joblib.dump(le, ENCODER_PATH)
+    state = save_state(df['id'].max(), df['timestamp'].max(), last_by_mule, state.get('store_path'))
+    version = registry.publish(model, le, {'id': state['watermark_id'], 'ts': state['watermark_ts'], 'rows': len(pairs)},
+                               catalog=AtmCatalog.from_db(DB_PATH))
+    print(f"✅ Model updated: {len(model.estimators_)} trees, watermark id {state['watermark_id']}, version {version}")
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the next-location model")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only learn from complaints added since the last run")
+    parser.add_argument("--new-trees", type=int, default=10, help="trees added per incremental run")
+    parser.add_argument("--max-trees", type=int, default=300, help="forest size cap for incremental runs")
+    parser.add_argument("--replay-rows", type=int, default=REPLAY_ROWS,
+                        help="historical patterns replayed next to the new ones in incremental runs")
+    parser.add_argument("--chunk-rows", type=int, default=200_000,
+                        help="rows per chunk in the streaming feature pipeline (bounds peak memory)")
+    parser.add_argument("--search", action="store_true",
+                        help="pick hyperparameters with a parallel sweep on a time-based validation split first")
+    parser.add_argument("--cores", type=int, default=os.cpu_count(),
+                        help="core budget for training and for the search's process pool")
+    parser.add_argument("--val-fraction", type=float, default=0.2,
+                        help="newest share of the patterns (by time) held out for validation in --search")
+    parser.add_argument("--model", choices=BACKENDS, default='forest',
+                        help="forest = RandomForest (compiled for serving), hgb = histogram gradient boosting")
+    args = parser.parse_args()
+    if args.search and args.model != 'forest':
+        parser.error("--search tunes the forest backend only")
+
+    if args.incremental:
+        train_incremental(args.new_trees, args.max_trees, args.replay_rows)
+    else:
+        train(args.chunk_rows, args.cores, args.search, args.val_fraction, args.model)
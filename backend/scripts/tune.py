@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import itertools
+import tracemalloc
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.ensemble import RandomForestRegressor
+
+try:
+    import resource  # peak RSS; Unix only
+except ImportError:
+    resource = None
+
+from features import FEATURES, TARGETS, FeatureStore, with_unknown_bucket
+from geo import haversine
+
+# --- CONFIG ---
+TRIALS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data/search_trials.csv')
+
+# Grid swept by `train_model.py --search`; n_estimators is chosen by early stopping
+SEARCH_SPACE = {
+    'max_depth': [None, 24, 16],
+    'min_samples_leaf': [1, 4],
+    'max_features': [1.0, 0.5],
+}
+TREE_STEP = 25         # trees added between two validation checks
+MAX_TREES = 300
+PATIENCE = 2           # checks without improvement before a trial stops
+MIN_IMPROVEMENT = 0.005  # relative drop in mean error that counts as improvement
+
+def parameter_grid(space=SEARCH_SPACE):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+def time_split_cutoff(store, val_fraction=0.2):
+    """Timestamp splitting the store into the oldest (1 - val_fraction) for training and the newest for validation"""
+    return int(np.quantile(np.asarray(store['timestamp']), 1 - val_fraction))
+
+def load_split(store, cutoff):
+    """(X_train, y_train, X_val, y_val): pairs starting before `cutoff` train, the rest validate"""
+    is_train = np.asarray(store['timestamp']) < cutoff
+    X = store.matrix(FEATURES, dtype=np.float32)
+    y = store.matrix(TARGETS)
+    return X[is_train], y[is_train], X[~is_train], y[~is_train]
+
+def validation_error(model, X_val, y_val):
+    """Per-row haversine error in meters, the same measure verify_model.py reports"""
+    pred = model.predict(X_val)
+    return haversine(y_val[:, 1], y_val[:, 0], pred[:, 1], pred[:, 0])
+
+def run_trial(trial, params, store_path, cutoff, n_jobs=1, seed=42,
+              tree_step=TREE_STEP, max_trees=MAX_TREES, patience=PATIENCE, min_improvement=MIN_IMPROVEMENT):
+    """
+    Grow a forest `tree_step` trees at a time (warm start) and stop once the mean
+    validation error has not improved for `patience` checks. Runs in a pool
+    worker: the feature store is memory-mapped from `store_path`, so workers
+    share one copy of it through the page cache.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    X_train, y_train, X_val, y_val = load_split(FeatureStore(store_path), cutoff)
+    X_train, y_train = with_unknown_bucket(X_train, y_train)
+
+    model = RandomForestRegressor(warm_start=True, random_state=seed, n_jobs=n_jobs, **params)
+    best = {'trees': 0, 'val_error_m': np.inf, 'val_p50_m': np.inf}
+    stale = 0
+    for n_trees in range(tree_step, max_trees + 1, tree_step):
+        model.n_estimators = n_trees
+        model.fit(X_train, y_train)
+        errors = validation_error(model, X_val, y_val)
+        if errors.mean() < best['val_error_m'] * (1 - min_improvement):
+            best = {'trees': n_trees, 'val_error_m': errors.mean(), 'val_p50_m': np.median(errors)}
+            stale = 0
+        else:
+            stale += 1
+            if stale >= patience:
+                break
+
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # ru_maxrss is KB on Linux; it covers the tree builders' native allocations that tracemalloc cannot see
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3 if resource else float('nan')
+    return dict(trial=trial, **params, **best, trees_grown=n_trees,
+                seconds=time.perf_counter() - started, peak_mb=peak_bytes / 1e6, peak_rss_mb=peak_rss)
+
+def search(store, cores, val_fraction=0.2, space=SEARCH_SPACE, trials_path=TRIALS_PATH, **trial_kwargs):
+    """
+    Sweep `space` over a process pool of `cores` workers. Each worker runs one
+    trial at a time; if there are fewer trials than cores, the spare cores go to
+    tree building inside each trial (n_jobs). Returns the trial table, best first,
+    and writes it to `trials_path`.
+    """
+    cutoff = time_split_cutoff(store, val_fraction)
+    grid = parameter_grid(space)
+    workers = max(1, min(cores, len(grid)))
+    n_jobs = max(1, cores // workers)
+    print(f"🔎 {len(grid)} trials on {workers} worker(s) x {n_jobs} core(s); "
+          f"validating on pairs after {pd.Timestamp(cutoff, unit='s')}")
+
+    # A fresh process per trial keeps peak RSS a per-trial number (Python 3.11+)
+    fresh = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+    trials = []
+    with ProcessPoolExecutor(max_workers=workers, **fresh) as pool:
+        futures = [pool.submit(run_trial, i, params, store.path, cutoff, n_jobs, **trial_kwargs)
+                   for i, params in enumerate(grid)]
+        for future in as_completed(futures):
+            result = future.result()
+            trials.append(result)
+            print(f"   trial {result['trial']:>2}: {result['trees']:>3} trees  "
+                  f"{result['val_error_m']:>10.0f} m  {result['seconds']:>6.1f} s  {result['peak_rss_mb']:>7.1f} MB")
+
+    table = pd.DataFrame(trials).sort_values('val_error_m').reset_index(drop=True)
+    table.to_csv(trials_path, index=False)
+    return table
@@ -3,82 +3,114 @@ import numpy as np
 import sqlite3
 import joblib
 import os
-from math import radians, cos, sin, asin, sqrt
+import time
+
+from features import TARGETS, MuleEncoder, open_feature_store, predict_store
+from geo import haversine
+import registry
 
 # --- CONFIG ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, '../data/crime_data.db')
 MODEL_PATH = os.path.join(BASE_DIR, '../data/model_next_loc.pkl')
 ENCODER_PATH = os.path.join(BASE_DIR, '../data/label_encoder.pkl')
+PREDICT_CHUNK = 100_000  # rows scored per model.predict call
+
+def error_breakdown(distances, groups, labels, top=None):
+    """Count / mean / p50 / p90 error per group code, worst mean first"""
+    errors = pd.DataFrame({'group': groups, 'error': distances}).groupby('group')['error']
+    table = errors.agg(['count', 'mean'])
+    table[['p50', 'p90']] = errors.quantile([0.5, 0.9]).unstack()
+    table = table.sort_values('mean', ascending=False)
+    if top:
+        table = table.head(top)
+    table.index = labels(table.index.to_numpy())
+    return table
+
+def mule_labels(encoder, codes):
+    """Mule ids of `codes`; rows of mules added after the encoder carry its unknown code"""
+    labels = np.full(len(codes), '(unseen mule)', dtype=object)
+    known = codes != encoder.unknown_code
+    labels[known] = encoder.inverse_transform(codes[known])
+    return labels
 
-def haversine(lon1, lat1, lon2, lat2):
+def split_unseen(store, encoder, distances):
     """
-    Calculate the great circle distance in meters between two points 
-    on the earth (specified in decimal degrees)
+    (seen, unseen) per-row errors of the saved model. Rows of mules added after
+    the model was trained carry the encoder's unknown code in the store, so the
+    model scored them through the unknown-mule bucket without ever having seen
+    them: that is the real unseen-mule error, with no refit. Rescoring seen
+    mules' rows with the bucket code would be in-sample (the bucket was trained
+    on copies of those rows).
     """
-    # convert decimal degrees to radians 
-    lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-
-    # haversine formula 
-    dlon = lon2 - lon1 
-    dlat = lat2 - lat1 
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a)) 
-    r = 6371 # Radius of earth in kilometers. Use 6371 for km
-    return c * r * 1000 # Convert to meters
+    unseen = np.asarray(store['mule_id_encoded']) == encoder.unknown_code
+    return distances[~unseen], distances[unseen]
 
 def verify():
+    timings = {}
     print("⏳ Loading Model and Data...")
     
     # 1. Load Model
-    if not os.path.exists(MODEL_PATH):
+    started = time.perf_counter()
+    # The registry's current version if there is one, else the legacy files
+    version = registry.current_version()
+    if version:
+        model_path = os.path.join(registry.version_path(version), 'model.pkl')
+        encoder_path = os.path.join(registry.version_path(version), 'encoder.pkl')
+        print(f"🗃️  Registry version: {version}")
+    else:
+        model_path, encoder_path = MODEL_PATH, ENCODER_PATH
+    if not os.path.exists(model_path):
         print("❌ Error: Model file not found. Run train_model.py first.")
         return
-    model = joblib.load(MODEL_PATH)
-    encoder = joblib.load(ENCODER_PATH)
-
-    # 2. Load Data (Same logic as training)
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM complaints", conn)
-    conn.close()
-
-    # Preprocessing
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values(by=['mule_account_id', 'timestamp'])
-    df['hour'] = df['timestamp'].dt.hour
-    df['day_of_week'] = df['timestamp'].dt.dayofweek
-    df['mule_id_encoded'] = encoder.transform(df['mule_account_id'])
-
-    # Create Targets
-    df['actual_next_lat'] = df.groupby('mule_account_id')['withdrawal_lat'].shift(-1)
-    df['actual_next_long'] = df.groupby('mule_account_id')['withdrawal_long'].shift(-1)
-    df = df.dropna(subset=['actual_next_lat', 'actual_next_long'])
-
-    # 3. Run Predictions on ALL data
-    X = df[['mule_id_encoded', 'withdrawal_lat', 'withdrawal_long', 'hour', 'day_of_week']]
-    
-    print(f"🧠 Testing model on {len(df)} past crimes...")
-    predictions = model.predict(X)
-
-    # 4. Calculate Error (Distance in Meters)
-    distances = []
-    for i in range(len(df)):
-        act_lat = df.iloc[i]['actual_next_lat']
-        act_lng = df.iloc[i]['actual_next_long']
-        pred_lat = predictions[i][0]
-        pred_lng = predictions[i][1]
-        
-        dist = haversine(act_lng, act_lat, pred_lng, pred_lat)
-        distances.append(dist)
+    model = joblib.load(model_path)
+    encoder = joblib.load(encoder_path)
+    if not isinstance(encoder, MuleEncoder):
+        encoder = MuleEncoder.from_label_encoder(encoder)  # legacy LabelEncoder: same codes
+    timings['load'] = time.perf_counter() - started
+
+    # 2. Load Features: the memory-mapped store train_model.py built for this data
+    # and encoder (built here only if the data changed since training)
+    started = time.perf_counter()
+    store = open_feature_store(DB_PATH, encoder)
+    timings['features'] = time.perf_counter() - started
+
+    # 3. Run Predictions on ALL data, one chunk at a time
+    print(f"🧠 Testing model on {len(store)} past crimes...")
+    started = time.perf_counter()
+    predictions = predict_store(model, store, PREDICT_CHUNK)
+    timings['predict'] = time.perf_counter() - started
+
+    # 4. Calculate Error (Distance in Meters) for every prediction in one array operation
+    started = time.perf_counter()
+    actual = store.matrix(TARGETS)
+    origin = store.matrix(['withdrawal_lat', 'withdrawal_long'])
+    distances = haversine(actual[:, 1], actual[:, 0], predictions[:, 1], predictions[:, 0])
+    avg_error = distances.mean()
+    p50, p90, p99 = np.percentile(distances, [50, 90, 99])
+    by_fraud = error_breakdown(distances, store['fraud_type_code'],
+                               lambda codes: np.asarray(store.meta['fraud_types'], dtype=object)[codes])
+    by_mule = error_breakdown(distances, store['mule_id_encoded'], lambda codes: mule_labels(encoder, codes), top=10)
+    timings['score'] = time.perf_counter() - started
 
-    avg_error = np.mean(distances)
+    # 4b. Unseen-mule path: complaints of mules newer than the saved model, which
+    # it scored through the unknown-mule bucket (what a new mule's first complaint gets)
+    seen, unseen = split_unseen(store, encoder, distances) if encoder.unknown_code is not None else (distances, None)
+    if version:
+        registry.record_metrics(version, {
+            'rows': int(len(actual)), 'avg_error_m': float(avg_error),
+            'p50_m': float(p50), 'p90_m': float(p90), 'p99_m': float(p99),
+            'unseen_rows': int(len(unseen)) if unseen is not None else 0,
+            'unseen_avg_error_m': float(unseen.mean()) if unseen is not None and len(unseen) else None,
+        })
     
     # 5. The Report
     print("\n" + "="*40)
     print("📊 MODEL PERFORMANCE REPORT")
     print("="*40)
-    print(f"✅ Total Predictions: {len(df)}")
+    print(f"✅ Total Predictions: {len(actual)}")
     print(f"🎯 Average Prediction Error: {avg_error:.2f} meters")
+    print(f"📏 Percentiles: p50 {p50:.0f} m | p90 {p90:.0f} m | p99 {p99:.0f} m")
     
     if avg_error < 500:
         print("🌟 STATUS: EXCELLENT (Error < 500m)")
@@ -87,22 +119,43 @@ def verify():
     else:
         print("⚠️ STATUS: NEEDS IMPROVEMENT (Error > 2km)")
 
+    print("\n🗂️  ERROR BY FRAUD TYPE (meters)")
+    print("-" * 40)
+    print(by_fraud.round(0).to_string())
+
+    print("\n🏦 WORST 10 MULES BY MEAN ERROR (meters)")
+    print("-" * 40)
+    print(by_mule.round(0).to_string())
+
+    print("\n🆕 SEEN vs UNSEEN MULES")
+    print("-" * 40)
+    if unseen is None:
+        print("   Model has no unknown-mule bucket: unseen mules are rejected. Retrain with train_model.py.")
+    elif not len(unseen):
+        print("   No complaints of mules newer than this model yet: only seen mules can be scored.")
+    else:
+        print(f"   unseen = {len(unseen)} rows of mules added after training, scored by the bucket")
+        for label, errors in (('seen (in-sample)', seen), ('unseen (new mules)', unseen)):
+            p50_, p90_ = np.percentile(errors, [50, 90])
+            print(f"   {label:<18} mean {errors.mean():>9.0f} m | p50 {p50_:>8.0f} m | p90 {p90_:>8.0f} m")
+
+    print("\n⏱️  TIMING")
+    print("-" * 40)
+    for phase, seconds in timings.items():
+        print(f"   {phase:<9} {seconds * 1000:>10.1f} ms")
+
     # 6. Sanity Check (The Delhi Gang Test)
     print("\n🕵️  SANITY CHECK (Manual Inspection)")
     print("-" * 40)
     # Let's pick 3 random examples to show "Real vs Predicted"
-    indices = np.random.choice(df.index, 3, replace=False)
+    indices = np.random.choice(len(actual), 3, replace=False)
     for idx in indices:
-        row = df.loc[idx]
-        pred_idx = df.index.get_loc(idx) # Find integer index for prediction array
-        pred = predictions[pred_idx]
-        
-        dist = haversine(row['actual_next_long'], row['actual_next_lat'], pred[1], pred[0])
+        pred = predictions[idx]
         
-        print(f"📍 From: {row['withdrawal_lat']:.4f}, {row['withdrawal_long']:.4f}")
-        print(f"   Expected Next: {row['actual_next_lat']:.4f}, {row['actual_next_long']:.4f}")
+        print(f"📍 From: {origin[idx][0]:.4f}, {origin[idx][1]:.4f}")
+        print(f"   Expected Next: {actual[idx][0]:.4f}, {actual[idx][1]:.4f}")
         print(f"   AI Predicted:  {pred[0]:.4f}, {pred[1]:.4f}")
-        print(f"   Error: {dist:.0f} meters")
+        print(f"   Error: {distances[idx]:.0f} meters")
         print("-" * 20)
 
 if __name__ == "__main__":
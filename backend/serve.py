@@ -0,0 +1,73 @@
+"""
+Multi-process prediction server
+Runs backend.main:app in N uvicorn worker processes. Tree inference holds the
+GIL, so one process uses one core; N workers use N cores.
+
+uvicorn starts every worker as a fresh interpreter (spawned, not forked), and
+each one imports backend.main and loads the model on its own at startup. For
+the forest that load is cheap and not a copy: every worker memory-maps the same
+compiled forest files read-only (scripts/forest.py), so the OS page cache holds
+a single copy of the trees however many workers run. The mule encoder, the ATM
+catalog and the interpreter are per worker, and so is a boosted (hgb) model,
+which each worker unpickles in full. Before starting the workers the parent
+only makes sure the compiled files exist and pages them in once.
+
+Worker count: one per core (the default, os.cpu_count()). Inference is pure
+CPU work, so more workers than cores only adds context switches; leave a core
+free if the load generator or the database runs on the same machine.
+MODEL_POLL_SECONDS / PREDICT_* settings apply to every worker; each worker
+hot-swaps registry versions on its own within one poll interval.
+
+Per-process state: only the model files and the SQLite databases are shared.
+Each worker has its own
+- /predict micro-batcher (and group-commit buffer): batches never span
+  workers, and /predict/stats and /alerts/stats describe one worker only;
+- AlertBroadcaster: a GET /alerts/stream subscriber only receives live alerts
+  created by the worker it is connected to. Alerts from other workers are in
+  the table and arrive on the next reconnect (catch-up by last id), not live;
+- MuleStateStore: catches up from the complaints table, so a complaint posted
+  to one worker is seen by the others within MULE_STATE_REFRESH_MS.
+Run with --workers 1 if live alert streams must carry every alert.
+
+Usage: python -m backend.serve [--workers N] [--host 0.0.0.0] [--port 8000]
+Benchmark: python backend/scripts/bench_workers.py
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+from .predictor import MODEL_PATH, CompiledForest, ensure_compiled, registry
+
+def prepare_shared_model():
+    """Make sure the compiled forest exists and is in the page cache before the workers start"""
+    version = registry.current_version()
+    if version:
+        path = os.path.join(registry.version_path(version), 'forest')
+    elif os.path.exists(MODEL_PATH):
+        path = ensure_compiled(MODEL_PATH)
+    else:
+        print("⚠️ No model yet: workers will answer 503 until train_model.py publishes one")
+        return None
+    if not path or not os.path.exists(path):
+        print("ℹ️  Boosted model: every worker loads its own copy of the pickle")
+        return None
+    CompiledForest(path).touch()
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-process prediction server')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes (default: one per core)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    path = prepare_shared_model()
+    if path:
+        print(f"📦 Shared model: {path}")
+    print(f"🚀 Starting {args.workers} worker(s) on http://{args.host}:{args.port}")
+    uvicorn.run('backend.main:app', host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import asyncio
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+
+# Never the working directory's backend.db: main.py creates its tables on import
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'backend.db')}")
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from backend import crud, main, models  # noqa: E402
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+@pytest.fixture(autouse=True)
+def empty_alerts():
+    with main.engine.begin() as conn:
+        conn.execute(models.Alert.__table__.delete())
+
+@asynccontextmanager
+async def serve(group_commit=False):
+    """The app with its lifespan running, driven through ASGI like bench_alerts.py --in-process"""
+    main.ALERT_GROUP_COMMIT = group_commit
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url='http://test') as client:
+                yield client
+    finally:
+        main.ALERT_GROUP_COMMIT = False
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('group_commit', [False, True])
+async def test_null_status_is_stored_as_active(group_commit):
+    async with serve(group_commit) as client:
+        for body in ({'type': 'Velocity Spike', 'status': None}, {'type': 'Velocity Spike'}):
+            assert (await client.post('/alerts', json=body)).status_code == 200
+        alerts = (await client.get('/alerts')).json()
+    assert [a['status'] for a in alerts] == ['Active', 'Active']
+
+def test_alert_row_keeps_an_explicit_status():
+    assert crud.alert_row({'status': 'Resolved'})['status'] == 'Resolved'
+
+@pytest.mark.anyio
+async def test_sync_and_async_writes_are_published_in_id_order():
+    async with serve() as client:
+        sub = main.app.state.alert_feed.subscribe()
+        responses = await asyncio.gather(*(client.post('/alerts/sync' if i % 2 else '/alerts', json={'type': f"T{i}"})
+                                           for i in range(60)))
+        await asyncio.sleep(0)  # let the last queued publish run
+        published = [sub.queue.get_nowait()['id'] for _ in range(sub.queue.qsize())]
+    assert sorted(r.json()['id'] for r in responses) == published == sorted(published)
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('body', ['{"type": "Velocity Spike"}', '"Velocity Spike"', 'null'])
+async def test_bulk_rejects_a_json_body_that_is_not_an_array(body):
+    async with serve() as client:
+        response = await client.post('/alerts/bulk', content=body, headers={'content-type': 'application/json'})
+        assert response.status_code == 422
+        assert (await client.get('/alerts')).json() == []
+
+@pytest.mark.anyio
+async def test_bulk_reads_ndjson_only_when_the_content_type_says_so():
+    ndjson = '{"type": "Velocity Spike"}\n{"type": "Mule Withdrawal"}\n'
+    async with serve() as client:
+        as_json = await client.post('/alerts/bulk', content=ndjson, headers={'content-type': 'application/json'})
+        assert as_json.status_code == 400
+        as_ndjson = await client.post('/alerts/bulk', content=ndjson, headers={'content-type': 'application/x-ndjson'})
+        assert as_ndjson.status_code == 200
+        assert as_ndjson.json()['count'] == 2
+        as_array = await client.post('/alerts/bulk', json=[{'type': 'Velocity Spike'}])
+        assert as_array.json()['count'] == 1
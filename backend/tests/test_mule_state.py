@@ -0,0 +1,81 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from backend.mule_state import MuleStateStore, insert_complaint  # noqa: E402
+
+SCHEMA = """
+    CREATE TABLE complaints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        complaint_id TEXT NOT NULL,
+        fraud_type TEXT NOT NULL,
+        amount INTEGER,
+        mule_account_id TEXT,
+        withdrawal_atm_id TEXT,
+        withdrawal_lat REAL,
+        withdrawal_long REAL,
+        location_name TEXT,
+        timestamp DATETIME,
+        status TEXT
+    )
+"""
+
+def complaint(mule, lat, long, timestamp):
+    return {'complaint_id': f"C-{mule}-{timestamp}", 'fraud_type': 'Job Scam', 'mule_account_id': mule,
+            'withdrawal_lat': lat, 'withdrawal_long': long, 'timestamp': timestamp}
+
+@pytest.fixture
+def crime_db(tmp_path):
+    path = str(tmp_path / 'crime_data.db')
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    conn.close()
+    insert_complaint(complaint('MULE_A', 28.6, 77.2, '2024-01-01 10:00:00'), path)
+    return path
+
+@pytest.fixture
+def store(tmp_path, crime_db):
+    store = MuleStateStore(capacity=10, db_path=str(tmp_path / 'mule_state.db'), crime_db_path=crime_db, refresh_s=0)
+    store.warm_start()
+    yield store
+    store.close()
+
+def test_lookup_reads_no_table_without_new_complaints(store):
+    statements = []
+    store._source.set_trace_callback(statements.append)
+    for _ in range(3):
+        assert store.get('MULE_A').lat == 28.6
+    assert statements == ['PRAGMA data_version'] * 3
+
+def test_lookups_within_refresh_interval_skip_sqlite(store, crime_db):
+    store.refresh_s = 60
+    store.catch_up()
+    statements = []
+    store._source.set_trace_callback(statements.append)
+    insert_complaint(complaint('MULE_A', 12.9, 77.5, '2024-01-01 11:00:00'), crime_db)
+    assert store.get('MULE_A').lat == 28.6
+    assert statements == []
+    store.catch_up()
+    assert store.get('MULE_A').lat == 12.9
+
+def test_new_complaint_from_another_connection_is_applied(store, crime_db):
+    store.get('MULE_A')
+    insert_complaint(complaint('MULE_A', 12.9, 77.5, '2024-01-01 11:00:00'), crime_db)
+    assert store.get('MULE_A').lat == 12.9
+
+def test_unusable_rows_are_passed_over(store, crime_db):
+    conn = sqlite3.connect(crime_db)
+    with conn:
+        conn.executemany(
+            "INSERT INTO complaints (complaint_id, fraud_type, mule_account_id, withdrawal_lat, withdrawal_long, timestamp)"
+            " VALUES ('bad', 'Job Scam', 'MULE_A', ?, ?, ?)",
+            [(12.9, 77.5, None), (None, 77.5, '2024-01-01 12:00:00'), (12.9, 77.5, 'yesterday')])
+    conn.close()
+    good_id, _ = insert_complaint(complaint('MULE_A', 13.0, 77.6, '2024-01-01 13:00:00'), crime_db)
+
+    assert store.get('MULE_A').lat == 13.0
+    assert store.watermark == good_id
+    assert store.stats['skipped'] == 1  # the NULL rows are filtered out by the query
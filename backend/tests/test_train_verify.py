@@ -0,0 +1,108 @@
+import os
+import sys
+import sqlite3
+import hashlib
+import functools
+from datetime import datetime, timedelta
+
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+# The training scripts import each other as top-level modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../scripts'))
+import features  # noqa: E402
+import registry  # noqa: E402
+import train_model  # noqa: E402
+import verify_model  # noqa: E402
+
+SCHEMA = """
+    CREATE TABLE complaints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        complaint_id TEXT NOT NULL,
+        fraud_type TEXT NOT NULL,
+        amount INTEGER,
+        mule_account_id TEXT,
+        withdrawal_atm_id TEXT,
+        withdrawal_lat REAL,
+        withdrawal_long REAL,
+        location_name TEXT,
+        timestamp DATETIME,
+        status TEXT
+    )
+"""
+
+def make_db(path, mules=6, per_mule=8):
+    """Small complaints table: every mule withdraws at a few ATMs, one hour apart"""
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for m in range(mules):
+        for i in range(per_mule):
+            atm = (m + i) % 3
+            rows.append((f"CMP{m:02d}{i:02d}", 'Job Scam', 1000, f"MULE_{m:02d}", f"ATM_{atm}",
+                         28.6 + atm * 0.01, 77.2 + atm * 0.01, f"Place {atm}",
+                         (start + timedelta(hours=m * per_mule + i)).strftime('%Y-%m-%d %H:%M:%S'), 'Open'))
+    conn.executemany("""
+        INSERT INTO complaints (complaint_id, fraud_type, amount, mule_account_id, withdrawal_atm_id,
+                                withdrawal_lat, withdrawal_long, location_name, timestamp, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """train_model / verify_model pointed at a scratch database, store root and model files"""
+    db_path = str(tmp_path / 'crime_data.db')
+    make_db(db_path)
+    stores = tmp_path / 'features'
+    for module in (train_model, verify_model):
+        monkeypatch.setattr(module, 'DB_PATH', db_path)
+        monkeypatch.setattr(module, 'MODEL_PATH', str(tmp_path / 'model_next_loc.pkl'))
+        monkeypatch.setattr(module, 'ENCODER_PATH', str(tmp_path / 'label_encoder.pkl'))
+        monkeypatch.setattr(module, 'open_feature_store',
+                            functools.partial(features.open_feature_store, root=str(stores)))
+    monkeypatch.setattr(train_model, 'STATE_PATH', str(tmp_path / 'train_state.pkl'))
+    # No registry: verify_model falls back to MODEL_PATH / ENCODER_PATH
+    monkeypatch.setattr(registry, 'publish', lambda *args, **kwargs: None)
+    monkeypatch.setattr(registry, 'current_version', lambda *args, **kwargs: None)
+    return stores
+
+def test_verify_reuses_the_store_train_built(workspace, capsys):
+    train_model.train(cores=1)
+    built = os.listdir(workspace)
+    assert len(built) == 1
+    capsys.readouterr()
+
+    verify_model.verify()
+    assert os.listdir(workspace) == built
+    out = capsys.readouterr().out
+    assert f"Using cached feature store {built[0]}" in out
+    assert "Building feature store" not in out
+
+def test_training_leaves_the_database_file_untouched(workspace):
+    def digest():
+        with open(train_model.DB_PATH, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    before = digest()
+    train_model.train(cores=1)
+    verify_model.verify()
+    assert digest() == before
+
+def test_verify_scores_new_mules_with_the_saved_model(workspace, capsys, monkeypatch):
+    train_model.train(cores=1)
+    conn = sqlite3.connect(train_model.DB_PATH)
+    conn.executemany("""
+        INSERT INTO complaints (complaint_id, fraud_type, amount, mule_account_id, withdrawal_atm_id,
+                                withdrawal_lat, withdrawal_long, location_name, timestamp, status)
+        VALUES (?, 'Job Scam', 1000, 'MULE_NEW', 'ATM_0', 28.6, 77.2, 'Place 0', ?, 'Open')
+    """, [(f"CMPNEW{i}", f"2024-02-01 0{i}:00:00") for i in range(3)])
+    conn.commit()
+    conn.close()
+    # The saved model is scored as it is: fitting anything here would be a training run
+    monkeypatch.setattr(RandomForestRegressor, 'fit', lambda *args, **kwargs: pytest.fail("verify refit the model"))
+    capsys.readouterr()
+
+    verify_model.verify()
+    assert "unseen = 2 rows of mules added after training" in capsys.readouterr().out
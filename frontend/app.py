@@ -10,6 +10,8 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 import os
 
+from migrations import migrate_all
+
 # ==================== CONFIGURATION ====================
 PASSWORD_REQUIREMENTS = {
     'min_length': 8,
@@ -65,6 +67,11 @@ EMAIL_CONFIG = {
 def get_db_path():
     return os.path.join(os.path.dirname(__file__), 'users.db')
 
+@st.cache_resource
+def migrate_databases():
+    """Apply pending schema migrations once per server process, not on every rerun"""
+    return migrate_all()
+
 def init_db():
     """Initialize database"""
     conn = sqlite3.connect(get_db_path())
@@ -458,6 +465,7 @@ st.markdown("""
 
 # Initialize
 init_db()
+migrate_databases()
 
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
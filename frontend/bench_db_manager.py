@@ -0,0 +1,77 @@
+"""
+Micro-benchmark for DatabaseManager
+Replays the queries of one Dashboard page render and reports connects and
+milliseconds per render: the original per-widget calls connect-per-call and
+pooled, the single get_dashboard_snapshot call the page now makes, and the
+same with the shared query cache (every render after the first is a hit).
+
+Usage: python frontend/bench_db_manager.py [--renders 200]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(__file__))
+
+from db_manager import DatabaseManager
+
+DB_FILES = ['users.db', 'complaints.db', 'predictions.db', 'alerts.db']
+
+def copy_databases(target_dir: str):
+    """Copy the portal databases so the benchmark never touches the real files"""
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in DB_FILES:
+        shutil.copy(os.path.join(source_dir, name), os.path.join(target_dir, name))
+
+def render_dashboard(db: DatabaseManager, user_role: str = 'I4C Officer'):
+    """Per-widget DatabaseManager calls pages/1_Dashboard.py used to make"""
+    db.get_user_stats(user_role)  # sidebar
+    db.get_user_stats(user_role)  # KPI row
+    db.get_active_alerts()
+    db.get_time_series_data(30)
+    db.get_complaints_by_fraud_type()
+    db.get_complaints_by_city()
+    db.get_recent_predictions(limit=5)
+
+def render_dashboard_snapshot(db: DatabaseManager, user_role: str = 'I4C Officer'):
+    """DatabaseManager calls pages/1_Dashboard.py makes today"""
+    db.get_dashboard_snapshot(user_role, days=30)
+    db.get_recent_predictions(limit=5)
+
+def run(label: str, pool_size: int, renders: int, render=render_dashboard, cache: bool = False):
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_databases(tmp)
+        db = DatabaseManager(base_path=tmp, pool_size=pool_size, cache=cache)
+        render(db)  # warm-up: first connects, page cache
+
+        connects_before = db.pool.stats['connects']
+        start = time.perf_counter()
+        for _ in range(renders):
+            render(db)
+        elapsed = time.perf_counter() - start
+        connects = db.pool.stats['connects'] - connects_before
+        db.pool.close_all()
+
+    ms_per_render = elapsed * 1000 / renders
+    print(f"{label:<26} {connects / renders:>10.1f} {ms_per_render:>12.3f}")
+    return ms_per_render
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--renders', type=int, default=200, help='dashboard renders per mode')
+    args = parser.parse_args()
+
+    print(f"{'mode':<26} {'connects/r':>10} {'ms/render':>12}")
+    before = run('connect-per-call', 0, args.renders)
+    run('pooled', 8, args.renders)
+    snapshot = run('pooled + snapshot', 8, args.renders, render_dashboard_snapshot)
+    cached = run('pooled + snapshot + cache', 8, args.renders, render_dashboard_snapshot, cache=True)
+    print(f"\n⚡ Speed-up (uncached): {before / snapshot:.1f}x")
+    print(f"⚡ Speed-up (cached):   {before / cached:.1f}x")
+
+if __name__ == "__main__":
+    main()
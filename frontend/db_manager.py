@@ -5,21 +5,281 @@ Handles all database operations with optimized queries
 
 import sqlite3
 import os
+import sys
+import copy
+import time
+import functools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, fields, is_dataclass
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Callable, List, Dict, Mapping, Optional, Tuple
+
+
+# Pragmas applied once to every pooled connection. WAL lets the dashboard read
+# while a writer commits; the rest trade a little durability for fewer fsyncs
+# and keep hot pages in memory between Streamlit reruns.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA busy_timeout=5000",
+)
+
+class ConnectionPool:
+    """Thread-safe pool of warm SQLite connections, one free-list per database file.
+
+    Streamlit runs every rerun on a fresh script thread, so connections are not
+    pinned to a thread: a thread checks one out, uses it and hands it back.
+    Nested checkouts of the same file on the same thread reuse the connection
+    already held. ``max_idle=0`` disables pooling (connect-per-call).
+    """
+
+    def __init__(self, max_idle: int = 4, timeout: float = 5.0):
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle: Dict[str, List[sqlite3.Connection]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {'connects': 0, 'checkouts': 0}
+        # Optional hook(db_path, conn) for new connections, e.g. a trace callback
+        self.on_connect: Optional[Callable] = None
+
+    def _open(self, db_path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(db_path, timeout=self.timeout, check_same_thread=False)
+        if self.max_idle > 0:
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+        if self.on_connect is not None:
+            self.on_connect(db_path, conn)
+        with self._lock:
+            self.stats['connects'] += 1
+        return conn
+
+    @contextmanager
+    def connection(self, db_path: str):
+        """Check out a connection for ``db_path`` and return it to the pool afterwards"""
+        held = getattr(self._local, 'held', None)
+        if held is None:
+            held = self._local.held = {}
+        if db_path in held:
+            yield held[db_path]
+            return
+
+        with self._lock:
+            self.stats['checkouts'] += 1
+            idle = self._idle.get(db_path)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            conn = self._open(db_path)
+
+        held[db_path] = conn
+        try:
+            yield conn
+        finally:
+            del held[db_path]
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                idle = self._idle.setdefault(db_path, [])
+                if len(idle) < self.max_idle:
+                    idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def close_all(self):
+        """Close every idle connection (e.g. before deleting or replacing a database file)"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+def _approx_size(obj) -> int:
+    """Rough deep size in bytes of a cached result (dicts, lists, tuples, dataclasses)"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None), datetime)):
+        return size
+    if isinstance(obj, Mapping):
+        return size + sum(_approx_size(k) + _approx_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return size + sum(_approx_size(v) for v in obj)
+    if is_dataclass(obj):
+        return size + sum(_approx_size(getattr(obj, f.name)) for f in fields(obj))
+    return size
+
+class QueryCache:
+    """Process-wide TTL + LRU cache for DatabaseManager read results.
+
+    The ``db`` singleton lives as long as the Streamlit server process, so every
+    session and rerun shares this cache. Entries remember which database files
+    they were computed from; an explicit ``invalidate(db_path)`` or a change of
+    ``PRAGMA data_version`` on that file (a commit from any other connection or
+    process) drops them. Concurrent misses on the same key are computed once.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, expires_at, db_paths, size)
+        self._bytes = 0
+        self._inflight: Dict[tuple, threading.Event] = {}
+        self._watchers: Dict[str, sqlite3.Connection] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _check_data_version(self, db_path: str):
+        """Invalidate ``db_path`` if something committed to it since the last look"""
+        watcher = self._watchers.get(db_path)
+        if watcher is None:
+            watcher = self._watchers[db_path] = sqlite3.connect(db_path, check_same_thread=False)
+        version = watcher.execute('PRAGMA data_version').fetchone()[0]
+        if self._versions.setdefault(db_path, version) != version:
+            self._versions[db_path] = version
+            self._invalidate_locked(db_path)
+
+    def _invalidate_locked(self, db_path: Optional[str]):
+        stale = [key for key, entry in self._entries.items() if db_path is None or db_path in entry[2]]
+        for key in stale:
+            self._bytes -= self._entries.pop(key)[3]
+        self.counters['invalidations'] += len(stale)
+
+    def invalidate(self, db_path: Optional[str] = None):
+        """Drop every entry computed from ``db_path`` (all entries if None)"""
+        with self._lock:
+            self._invalidate_locked(db_path)
+
+    def clear(self):
+        self.invalidate(None)
+
+    def _lookup(self, key: tuple, db_paths: Tuple[str, ...]):
+        with self._lock:
+            for db_path in db_paths:
+                self._check_data_version(db_path)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                self._bytes -= self._entries.pop(key)[3]
+                return None
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return entry
+
+    def _store(self, key: tuple, value, db_paths: Tuple[str, ...], ttl: float):
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[3]
+            self._entries[key] = (value, time.monotonic() + ttl, db_paths, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][3]
+                self.counters['evictions'] += 1
+
+    def get_or_compute(self, key: tuple, db_paths: Tuple[str, ...], ttl: float, compute: Callable):
+        """Return the cached value for ``key`` or compute, store and return it"""
+        while True:
+            entry = self._lookup(key, db_paths)
+            if entry is not None:
+                return entry[0]
+            with self._lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    self.counters['misses'] += 1
+                    break
+            # Another session is already running this query: wait for its result
+            pending.wait()
+
+        try:
+            value = compute()
+            self._store(key, value, db_paths, ttl)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            pending.set()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters plus current size, for monitoring"""
+        with self._lock:
+            lookups = self.counters['hits'] + self.counters['misses']
+            return {
+                **self.counters,
+                'hit_rate': round(self.counters['hits'] / lookups * 100, 1) if lookups else 0,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+def cached(ttl: float, *databases: str):
+    """Cache a DatabaseManager read method for ``ttl`` seconds.
+
+    ``databases`` are the attribute names (``'complaints_db'``, ...) of the files
+    the method reads, so writes to those files invalidate it. Results are shared
+    between sessions: dicts and lists are handed out as copies so a page that
+    mutates its result cannot corrupt the cache.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.cache is None:
+                return method(self, *args, **kwargs)
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            db_paths = tuple(getattr(self, name) for name in databases)
+            value = self.cache.get_or_compute(key, db_paths, ttl, lambda: method(self, *args, **kwargs))
+            return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+        return wrapper
+    return decorator
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Everything the Dashboard page renders, computed in one pass per database.
+
+    ``stats`` has the same keys as ``get_user_stats``; ``time_series`` the same
+    shape as ``get_time_series_data`` (with tuples); the distributions are
+    ordered by count, highest first.
+    """
+    stats: Mapping[str, float]
+    active_alerts: Tuple[Mapping[str, str], ...]
+    time_series: Mapping[str, tuple]
+    fraud_types: Mapping[str, int]
+    cities: Mapping[str, int]
+    generated_at: datetime
 
 class DatabaseManager:
     """Centralized database management for all operations"""
     
-    def __init__(self):
-        self.base_path = os.path.dirname(__file__)
+    def __init__(self, base_path: Optional[str] = None, pool_size: int = 8, cache: bool = True):
+        self.base_path = base_path or os.path.dirname(__file__)
         self.users_db = os.path.join(self.base_path, 'users.db')
         self.complaints_db = os.path.join(self.base_path, 'complaints.db')
         self.predictions_db = os.path.join(self.base_path, 'predictions.db')
         self.alerts_db = os.path.join(self.base_path, 'alerts.db')
+        self.pool = ConnectionPool(max_idle=pool_size)
+        self.cache = QueryCache() if cache else None
+    
+    def _connect(self, db_path: str):
+        """Borrow a pooled connection; use as ``with self._connect(path) as conn``"""
+        return self.pool.connection(db_path)
+    
+    def invalidate_cache(self, db_path: Optional[str] = None):
+        """Drop cached reads of ``db_path`` (everything if None) after a write"""
+        if self.cache is not None:
+            self.cache.invalidate(db_path)
     
     # ==================== USER OPERATIONS ====================
     
+    @cached(30, 'complaints_db', 'predictions_db', 'alerts_db')
     def get_user_stats(self, user_role: str) -> Dict:
         """Get role-based statistics for dashboard"""
         stats = {
@@ -32,59 +292,53 @@ class DatabaseManager:
         }
         
         # Complaints stats
-        conn = sqlite3.connect(self.complaints_db)
-        c = conn.cursor()
-        
-        c.execute('SELECT COUNT(*) FROM complaints')
-        stats['total_complaints'] = c.fetchone()[0]
-        
-        c.execute("SELECT COUNT(*) FROM complaints WHERE status != 'Resolved'")
-        stats['active_complaints'] = c.fetchone()[0]
-        
-        c.execute("SELECT SUM(amount_lost) FROM complaints WHERE status = 'Resolved'")
-        result = c.fetchone()[0]
-        stats['amount_recovered'] = round(result * 0.68, 2) if result else 0  # 68% recovery rate
-        
-        conn.close()
+        with self._connect(self.complaints_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('SELECT COUNT(*) FROM complaints')
+            stats['total_complaints'] = c.fetchone()[0]
+            
+            c.execute("SELECT COUNT(*) FROM complaints WHERE status != 'Resolved'")
+            stats['active_complaints'] = c.fetchone()[0]
+            
+            c.execute("SELECT SUM(amount_lost) FROM complaints WHERE status = 'Resolved'")
+            result = c.fetchone()[0]
+            stats['amount_recovered'] = round(result * 0.68, 2) if result else 0  # 68% recovery rate
         
         # Predictions stats
-        conn = sqlite3.connect(self.predictions_db)
-        c = conn.cursor()
-        
-        c.execute('SELECT COUNT(*) FROM predictions')
-        stats['total_predictions'] = c.fetchone()[0]
-        
-        c.execute('SELECT COUNT(*) FROM predictions WHERE prediction_accurate = 1')
-        accurate = c.fetchone()[0]
-        stats['success_rate'] = round((accurate / stats['total_predictions'] * 100), 1) if stats['total_predictions'] > 0 else 0
-        
-        conn.close()
+        with self._connect(self.predictions_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('SELECT COUNT(*) FROM predictions')
+            stats['total_predictions'] = c.fetchone()[0]
+            
+            c.execute('SELECT COUNT(*) FROM predictions WHERE prediction_accurate = 1')
+            accurate = c.fetchone()[0]
+            stats['success_rate'] = round((accurate / stats['total_predictions'] * 100), 1) if stats['total_predictions'] > 0 else 0
         
         # Alerts stats
-        conn = sqlite3.connect(self.alerts_db)
-        c = conn.cursor()
-        
-        c.execute("SELECT COUNT(*) FROM alerts WHERE status = 'Active'")
-        stats['active_alerts'] = c.fetchone()[0]
-        
-        conn.close()
+        with self._connect(self.alerts_db) as conn:
+            c = conn.cursor()
+            
+            c.execute("SELECT COUNT(*) FROM alerts WHERE status = 'Active'")
+            stats['active_alerts'] = c.fetchone()[0]
         
         return stats
     
     # ==================== COMPLAINT OPERATIONS ====================
     
+    @cached(15, 'complaints_db')
     def get_recent_complaints(self, limit: int = 10, status: Optional[str] = None) -> List[Dict]:
         """Get recent complaints with optional status filter"""
-        conn = sqlite3.connect(self.complaints_db)
-        c = conn.cursor()
-        
         query = 'SELECT * FROM complaints'
         if status:
             query += f" WHERE status = '{status}'"
         query += ' ORDER BY complaint_date DESC LIMIT ?'
         
-        c.execute(query, (limit,))
-        rows = c.fetchall()
+        with self._connect(self.complaints_db) as conn:
+            c = conn.cursor()
+            c.execute(query, (limit,))
+            rows = c.fetchall()
         
         complaints = []
         for row in rows:
@@ -106,55 +360,53 @@ class DatabaseManager:
                 'priority': row[14]
             })
         
-        conn.close()
         return complaints
     
+    @cached(60, 'complaints_db')
     def get_complaints_by_city(self) -> Dict[str, int]:
         """Get complaint count by city for heatmap"""
-        conn = sqlite3.connect(self.complaints_db)
-        c = conn.cursor()
-        
-        c.execute('''
-            SELECT incident_city, COUNT(*) 
-            FROM complaints 
-            GROUP BY incident_city 
-            ORDER BY COUNT(*) DESC
-        ''')
-        
-        city_data = {}
-        for row in c.fetchall():
-            city_data[row[0]] = row[1]
+        with self._connect(self.complaints_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('''
+                SELECT incident_city, COUNT(*) 
+                FROM complaints 
+                GROUP BY incident_city 
+                ORDER BY COUNT(*) DESC
+            ''')
+            
+            city_data = {}
+            for row in c.fetchall():
+                city_data[row[0]] = row[1]
         
-        conn.close()
         return city_data
     
+    @cached(60, 'complaints_db')
     def get_complaints_by_fraud_type(self) -> Dict[str, int]:
         """Get complaint count by fraud type"""
-        conn = sqlite3.connect(self.complaints_db)
-        c = conn.cursor()
-        
-        c.execute('''
-            SELECT fraud_type, COUNT(*) 
-            FROM complaints 
-            GROUP BY fraud_type 
-            ORDER BY COUNT(*) DESC
-        ''')
-        
-        fraud_data = {}
-        for row in c.fetchall():
-            fraud_data[row[0]] = row[1]
+        with self._connect(self.complaints_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('''
+                SELECT fraud_type, COUNT(*) 
+                FROM complaints 
+                GROUP BY fraud_type 
+                ORDER BY COUNT(*) DESC
+            ''')
+            
+            fraud_data = {}
+            for row in c.fetchall():
+                fraud_data[row[0]] = row[1]
         
-        conn.close()
         return fraud_data
     
+    @cached(15, 'complaints_db')
     def get_complaint_by_id(self, complaint_id: str) -> Optional[Dict]:
         """Get single complaint details"""
-        conn = sqlite3.connect(self.complaints_db)
-        c = conn.cursor()
-        
-        c.execute('SELECT * FROM complaints WHERE complaint_id = ?', (complaint_id,))
-        row = c.fetchone()
-        conn.close()
+        with self._connect(self.complaints_db) as conn:
+            c = conn.cursor()
+            c.execute('SELECT * FROM complaints WHERE complaint_id = ?', (complaint_id,))
+            row = c.fetchone()
         
         if not row:
             return None
@@ -178,19 +430,21 @@ class DatabaseManager:
     
     # ==================== PREDICTION OPERATIONS ====================
     
+    @cached(15, 'predictions_db')
     def get_recent_predictions(self, limit: int = 10) -> List[Dict]:
         """Get recent ML predictions"""
-        conn = sqlite3.connect(self.predictions_db)
-        c = conn.cursor()
-        
-        c.execute('''
-            SELECT * FROM predictions 
-            ORDER BY prediction_date DESC 
-            LIMIT ?
-        ''', (limit,))
+        with self._connect(self.predictions_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('''
+                SELECT * FROM predictions 
+                ORDER BY prediction_date DESC 
+                LIMIT ?
+            ''', (limit,))
+            rows = c.fetchall()
         
         predictions = []
-        for row in c.fetchall():
+        for row in rows:
             predictions.append({
                 'prediction_id': row[1],
                 'complaint_id': row[2],
@@ -209,160 +463,235 @@ class DatabaseManager:
                 'status': row[15]
             })
         
-        conn.close()
         return predictions
     
+    @cached(60, 'predictions_db')
     def get_prediction_accuracy_stats(self) -> Dict:
         """Calculate prediction accuracy statistics"""
-        conn = sqlite3.connect(self.predictions_db)
-        c = conn.cursor()
-        
-        c.execute('SELECT COUNT(*), AVG(confidence_1), AVG(prediction_accurate) FROM predictions')
-        row = c.fetchone()
-        
-        stats = {
-            'total_predictions': row[0] or 0,
-            'avg_confidence': round(row[1], 2) if row[1] else 0,
-            'accuracy_rate': round((row[2] * 100), 1) if row[2] else 0
-        }
-        
-        c.execute("SELECT prediction_method, COUNT(*) FROM predictions GROUP BY prediction_method")
-        stats['by_method'] = {row[0]: row[1] for row in c.fetchall()}
+        with self._connect(self.predictions_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('SELECT COUNT(*), AVG(confidence_1), AVG(prediction_accurate) FROM predictions')
+            row = c.fetchone()
+            
+            stats = {
+                'total_predictions': row[0] or 0,
+                'avg_confidence': round(row[1], 2) if row[1] else 0,
+                'accuracy_rate': round((row[2] * 100), 1) if row[2] else 0
+            }
+            
+            c.execute("SELECT prediction_method, COUNT(*) FROM predictions GROUP BY prediction_method")
+            stats['by_method'] = {row[0]: row[1] for row in c.fetchall()}
         
-        conn.close()
         return stats
     
     # ==================== ALERT OPERATIONS ====================
     
+    @cached(10, 'alerts_db')
     def get_active_alerts(self, severity: Optional[str] = None) -> List[Dict]:
         """Get active alerts with optional severity filter"""
-        conn = sqlite3.connect(self.alerts_db)
-        c = conn.cursor()
-        
         query = "SELECT * FROM alerts WHERE status = 'Active'"
         if severity:
             query += f" AND severity = '{severity}'"
         query += " ORDER BY created_at DESC"
         
-        c.execute(query)
+        with self._connect(self.alerts_db) as conn:
+            c = conn.cursor()
+            c.execute(query)
+            rows = c.fetchall()
         
-        alerts = []
-        for row in c.fetchall():
-            alerts.append({
-                'alert_id': row[1],
-                'alert_type': row[2],
-                'severity': row[3],
-                'title': row[4],
-                'message': row[5],
-                'location': row[8],
-                'status': row[11],
-                'created_at': row[12]
-            })
-        
-        conn.close()
-        return alerts
+        return [self._alert_from_row(row) for row in rows]
     
+    @staticmethod
+    def _alert_from_row(row: tuple) -> Dict:
+        """Map a ``SELECT * FROM alerts`` row to the dict the pages expect"""
+        return {
+            'alert_id': row[1],
+            'alert_type': row[2],
+            'severity': row[3],
+            'title': row[4],
+            'message': row[5],
+            'location': row[8],
+            'status': row[11],
+            'created_at': row[12]
+        }
+    
+    @cached(10, 'alerts_db')
     def get_alert_stats(self) -> Dict:
         """Get alert statistics"""
-        conn = sqlite3.connect(self.alerts_db)
-        c = conn.cursor()
-        
         stats = {}
         
-        c.execute("SELECT COUNT(*) FROM alerts WHERE status = 'Active'")
-        stats['active'] = c.fetchone()[0]
-        
-        c.execute("SELECT severity, COUNT(*) FROM alerts WHERE status = 'Active' GROUP BY severity")
-        stats['by_severity'] = {row[0]: row[1] for row in c.fetchall()}
-        
-        c.execute("SELECT COUNT(*) FROM alerts WHERE created_at > datetime('now', '-24 hours')")
-        stats['last_24h'] = c.fetchone()[0]
+        with self._connect(self.alerts_db) as conn:
+            c = conn.cursor()
+            
+            c.execute("SELECT COUNT(*) FROM alerts WHERE status = 'Active'")
+            stats['active'] = c.fetchone()[0]
+            
+            c.execute("SELECT severity, COUNT(*) FROM alerts WHERE status = 'Active' GROUP BY severity")
+            stats['by_severity'] = {row[0]: row[1] for row in c.fetchall()}
+            
+            c.execute("SELECT COUNT(*) FROM alerts WHERE created_at > datetime('now', '-24 hours')")
+            stats['last_24h'] = c.fetchone()[0]
         
-        conn.close()
         return stats
     
     def acknowledge_alert(self, alert_id: str, user_email: str) -> bool:
         """Mark alert as acknowledged"""
-        conn = sqlite3.connect(self.alerts_db)
-        c = conn.cursor()
-        
-        try:
-            c.execute('''
-                UPDATE alerts 
-                SET status = 'Acknowledged', 
-                    acknowledged_at = ?,
-                    assigned_to = ?
-                WHERE alert_id = ?
-            ''', (datetime.now().isoformat(), user_email, alert_id))
+        with self._connect(self.alerts_db) as conn:
+            c = conn.cursor()
             
-            conn.commit()
-            success = c.rowcount > 0
-        except Exception as e:
-            print(f"Error acknowledging alert: {e}")
-            success = False
-        finally:
-            conn.close()
-        
+            try:
+                c.execute('''
+                    UPDATE alerts 
+                    SET status = 'Acknowledged', 
+                        acknowledged_at = ?,
+                        assigned_to = ?
+                    WHERE alert_id = ?
+                ''', (datetime.now().isoformat(), user_email, alert_id))
+                
+                conn.commit()
+                success = c.rowcount > 0
+            except Exception as e:
+                print(f"Error acknowledging alert: {e}")
+                success = False
+        
+        if success:
+            self.invalidate_cache(self.alerts_db)
         return success
     
     # ==================== ANALYTICS OPERATIONS ====================
     
+    @cached(60, 'complaints_db')
     def get_time_series_data(self, days: int = 30) -> Dict:
         """Get time-series data for charts"""
-        conn = sqlite3.connect(self.complaints_db)
-        c = conn.cursor()
-        
-        c.execute('''
-            SELECT DATE(complaint_date) as date, COUNT(*) as count
-            FROM complaints
-            WHERE complaint_date > datetime('now', '-' || ? || ' days')
-            GROUP BY DATE(complaint_date)
-            ORDER BY date
-        ''', (days,))
+        with self._connect(self.complaints_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('''
+                SELECT DATE(complaint_date) as date, COUNT(*) as count
+                FROM complaints
+                WHERE complaint_date > datetime('now', '-' || ? || ' days')
+                GROUP BY DATE(complaint_date)
+                ORDER BY date
+            ''', (days,))
+            rows = c.fetchall()
         
         dates = []
         counts = []
-        for row in c.fetchall():
+        for row in rows:
             dates.append(row[0])
             counts.append(row[1])
         
-        conn.close()
-        
         return {'dates': dates, 'counts': counts}
     
+    @cached(60, 'complaints_db')
     def get_fraud_amount_by_type(self) -> Dict:
         """Get total fraud amount by type"""
-        conn = sqlite3.connect(self.complaints_db)
-        c = conn.cursor()
-        
-        c.execute('''
-            SELECT fraud_type, SUM(amount_lost) as total
-            FROM complaints
-            GROUP BY fraud_type
-            ORDER BY total DESC
-        ''')
-        
-        data = {row[0]: round(row[1], 2) for row in c.fetchall()}
-        conn.close()
+        with self._connect(self.complaints_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('''
+                SELECT fraud_type, SUM(amount_lost) as total
+                FROM complaints
+                GROUP BY fraud_type
+                ORDER BY total DESC
+            ''')
+            
+            data = {row[0]: round(row[1], 2) for row in c.fetchall()}
         
         return data
     
+    # ==================== DASHBOARD SNAPSHOT ====================
+    
+    @cached(10, 'complaints_db', 'predictions_db', 'alerts_db')
+    def get_dashboard_snapshot(self, user_role: str, days: int = 30) -> DashboardSnapshot:
+        """Compute every Dashboard KPI, distribution and trend with one query per database.
+
+        The complaints table is scanned once: rows are grouped on
+        (fraud type, city, day-within-window, resolved) - a few thousand groups
+        at most - and the KPIs, both distributions and the trend are folded
+        from those groups in Python.
+        """
+        with self._connect(self.complaints_db) as conn:
+            rows = conn.execute('''
+                SELECT fraud_type, incident_city,
+                       CASE WHEN complaint_date > datetime('now', '-' || ? || ' days')
+                            THEN DATE(complaint_date) END AS day,
+                       status = 'Resolved' AS resolved,
+                       COUNT(*), SUM(amount_lost)
+                FROM complaints
+                GROUP BY 1, 2, 3, 4
+            ''', (days,)).fetchall()
+        
+        total = active = 0
+        resolved_amount = 0.0
+        fraud_types: Dict[str, int] = {}
+        cities: Dict[str, int] = {}
+        per_day: Dict[str, int] = {}
+        for fraud_type, city, day, resolved, count, amount in rows:
+            total += count
+            # status = 'Resolved' is NULL for a NULL status, which is neither
+            # resolved nor active (the per-widget query was status != 'Resolved')
+            if resolved:
+                resolved_amount += amount or 0
+            elif resolved is not None:
+                active += count
+            fraud_types[fraud_type] = fraud_types.get(fraud_type, 0) + count
+            cities[city] = cities.get(city, 0) + count
+            if day is not None:
+                per_day[day] = per_day.get(day, 0) + count
+        
+        with self._connect(self.predictions_db) as conn:
+            total_predictions, accurate = conn.execute(
+                'SELECT COUNT(*), SUM(prediction_accurate = 1) FROM predictions'
+            ).fetchone()
+        
+        with self._connect(self.alerts_db) as conn:
+            alert_rows = conn.execute(
+                "SELECT * FROM alerts WHERE status = 'Active' ORDER BY created_at DESC"
+            ).fetchall()
+        active_alerts = tuple(MappingProxyType(self._alert_from_row(row)) for row in alert_rows)
+        
+        stats = {
+            'total_complaints': total,
+            'active_complaints': active,
+            'total_predictions': total_predictions,
+            'active_alerts': len(active_alerts),
+            'success_rate': round((accurate or 0) / total_predictions * 100, 1) if total_predictions > 0 else 0,
+            'amount_recovered': round(resolved_amount * 0.68, 2) if resolved_amount else 0  # 68% recovery rate
+        }
+        days_sorted = sorted(per_day)
+        
+        return DashboardSnapshot(
+            stats=MappingProxyType(stats),
+            active_alerts=active_alerts,
+            time_series=MappingProxyType({
+                'dates': tuple(days_sorted),
+                'counts': tuple(per_day[d] for d in days_sorted)
+            }),
+            fraud_types=MappingProxyType(dict(sorted(fraud_types.items(), key=lambda kv: kv[1], reverse=True))),
+            cities=MappingProxyType(dict(sorted(cities.items(), key=lambda kv: kv[1], reverse=True))),
+            generated_at=datetime.now()
+        )
+    
     # ==================== HEATMAP DATA ====================
     
+    @cached(60, 'complaints_db')
     def get_crime_locations(self) -> List[Dict]:
         """Get all crime locations for heatmap visualization"""
-        conn = sqlite3.connect(self.complaints_db)
-        c = conn.cursor()
-        
-        c.execute('''
-            SELECT incident_city, incident_state, COUNT(*) as count, 
-                   AVG(amount_lost) as avg_amount, fraud_type
-            FROM complaints
-            GROUP BY incident_city, incident_state, fraud_type
-        ''')
+        with self._connect(self.complaints_db) as conn:
+            c = conn.cursor()
+            
+            c.execute('''
+                SELECT incident_city, incident_state, COUNT(*) as count, 
+                       AVG(amount_lost) as avg_amount, fraud_type
+                FROM complaints
+                GROUP BY incident_city, incident_state, fraud_type
+            ''')
+            rows = c.fetchall()
         
         locations = []
-        for row in c.fetchall():
+        for row in rows:
             locations.append({
                 'city': row[0],
                 'state': row[1],
@@ -371,7 +700,6 @@ class DatabaseManager:
                 'fraud_type': row[4]
             })
         
-        conn.close()
         return locations
 
 # Create singleton instance
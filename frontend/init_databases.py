@@ -8,6 +8,8 @@ import random
 from datetime import datetime, timedelta
 import os
 
+from migrations import migrate_all
+
 def init_complaints_db():
     """Create complaints database with realistic cybercrime data"""
     db_path = os.path.join(os.path.dirname(__file__), 'complaints.db')
@@ -298,6 +300,9 @@ def main():
     init_alerts_db()
     init_users_db()
     
+    # Secondary indexes live in versioned migrations, not in the CREATE TABLEs
+    migrate_all()
+    
     print("\n✅ ALL DATABASES INITIALIZED SUCCESSFULLY!\n")
     print("Created databases:")
     print("  📁 complaints.db  - 50 cybercrime complaints")
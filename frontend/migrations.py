@@ -0,0 +1,176 @@
+"""
+Schema migrations for I4C Cybercrime Analytics Portal
+Versioned, idempotent index migrations for complaints.db, predictions.db and alerts.db.
+The applied version of each file is kept in PRAGMA user_version.
+
+Usage: python frontend/migrations.py          # migrate, print schema versions
+       python frontend/migrations.py --check  # also assert no hot query does a full scan
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+# database file -> ordered list of (version, description, statements).
+# Never edit a released step; append a new version instead.
+MIGRATIONS: Dict[str, List[Tuple[int, str, List[str]]]] = {
+    'complaints.db': [
+        (1, 'Indexes for dashboard, heatmap and complaint list access paths', [
+            # Recent complaints, time series and the "within last N days" window
+            'CREATE INDEX IF NOT EXISTS idx_complaints_date ON complaints (complaint_date)',
+            # Status filter + newest first; also answers the status KPIs
+            'CREATE INDEX IF NOT EXISTS idx_complaints_status_date ON complaints (status, complaint_date)',
+            # Covering index for the single-pass dashboard snapshot and fraud-type breakdowns
+            'CREATE INDEX IF NOT EXISTS idx_complaints_dashboard '
+            'ON complaints (fraud_type, incident_city, complaint_date, status, amount_lost)',
+            # Covering index for city / heatmap aggregates
+            'CREATE INDEX IF NOT EXISTS idx_complaints_location '
+            'ON complaints (incident_city, incident_state, fraud_type, amount_lost)',
+            'ANALYZE complaints',
+        ]),
+    ],
+    'predictions.db': [
+        (1, 'Indexes for recent predictions and accuracy statistics', [
+            'CREATE INDEX IF NOT EXISTS idx_predictions_date ON predictions (prediction_date)',
+            'CREATE INDEX IF NOT EXISTS idx_predictions_accuracy ON predictions (prediction_accurate, confidence_1)',
+            'CREATE INDEX IF NOT EXISTS idx_predictions_method ON predictions (prediction_method)',
+            'ANALYZE predictions',
+        ]),
+    ],
+    'alerts.db': [
+        (1, 'Partial indexes for active alerts and recency index', [
+            # Only active alerts are ever listed, so index just those rows
+            "CREATE INDEX IF NOT EXISTS idx_alerts_active_created "
+            "ON alerts (created_at) WHERE status = 'Active'",
+            "CREATE INDEX IF NOT EXISTS idx_alerts_active_severity "
+            "ON alerts (severity, created_at) WHERE status = 'Active'",
+            'CREATE INDEX IF NOT EXISTS idx_alerts_created ON alerts (created_at)',
+            'ANALYZE alerts',
+        ]),
+    ],
+}
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(db_path: str, migrations: List[Tuple[int, str, List[str]]]) -> int:
+    """Apply every step newer than the file's user_version; return the resulting version"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        version = get_schema_version(conn)
+        for step_version, description, statements in migrations:
+            if step_version <= version:
+                continue
+            with conn:  # one transaction per step: all statements or none
+                for sql in statements:
+                    conn.execute(sql)
+                # PRAGMA does not take bound parameters; the version is an int from MIGRATIONS
+                conn.execute(f'PRAGMA user_version = {int(step_version)}')
+            version = step_version
+            print(f"✅ {os.path.basename(db_path)}: migrated to v{version} ({description})")
+        return version
+    finally:
+        conn.close()
+
+def migrate_all(base_path: Optional[str] = None) -> Dict[str, int]:
+    """Migrate every portal database that exists under ``base_path``; safe to call on every startup"""
+    base_path = base_path or os.path.dirname(os.path.abspath(__file__))
+    versions = {}
+    for name, migrations in MIGRATIONS.items():
+        db_path = os.path.join(base_path, name)
+        if os.path.exists(db_path):
+            versions[name] = migrate(db_path, migrations)
+    return versions
+
+# ==================== QUERY PLAN CHECK ====================
+
+# "SCAN complaints" ("SCAN TABLE complaints" before SQLite 3.36) without
+# "USING [COVERING] INDEX" means a full table scan
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+
+def copy_databases(base_path: Optional[str], target_dir: str):
+    """Consistent copies (backup API, so WAL contents are included) of the portal databases"""
+    base_path = base_path or os.path.dirname(os.path.abspath(__file__))
+    for name in ['users.db', *MIGRATIONS]:
+        source_path = os.path.join(base_path, name)
+        if not os.path.exists(source_path):
+            continue
+        source, target = sqlite3.connect(source_path), sqlite3.connect(os.path.join(target_dir, name))
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+
+def check_query_plans(base_path: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    """Run every DatabaseManager read path, EXPLAIN each statement it issued and
+    return (database, sql, plan step) for every step that is a full table scan.
+    The paths run against temporary copies, so the write paths never touch live data.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_databases(base_path, tmp)
+        return _full_scans(tmp)
+
+def _full_scans(base_path: str) -> List[Tuple[str, str, str]]:
+    from db_manager import DatabaseManager
+
+    db = DatabaseManager(base_path=base_path, pool_size=1, cache=False)
+    statements = []
+    db.pool.on_connect = lambda path, conn: conn.set_trace_callback(
+        lambda sql: statements.append((path, sql))
+    )
+
+    db.get_user_stats('I4C Officer')
+    db.get_recent_complaints()
+    db.get_recent_complaints(status='Resolved')
+    db.get_complaints_by_city()
+    db.get_complaints_by_fraud_type()
+    db.get_complaint_by_id('CC-0000-00000')
+    db.get_recent_predictions()
+    db.get_prediction_accuracy_stats()
+    db.get_active_alerts()
+    db.get_active_alerts(severity='Critical')
+    db.get_alert_stats()
+    db.acknowledge_alert('ALERT-0000-0000', 'plan-check')
+    db.get_time_series_data(30)
+    db.get_fraud_amount_by_type()
+    db.get_dashboard_snapshot('I4C Officer', days=30)
+    db.get_crime_locations()
+    db.pool.close_all()
+
+    full_scans = []
+    for path, sql in statements:
+        if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            continue
+        conn = sqlite3.connect(path)
+        try:
+            plan = conn.execute('EXPLAIN QUERY PLAN ' + sql).fetchall()
+        finally:
+            conn.close()
+        for row in plan:
+            if FULL_SCAN.match(row[3]):
+                full_scans.append((os.path.basename(path), ' '.join(sql.split()), row[3]))
+    return full_scans
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate portal databases')
+    parser.add_argument('--check', action='store_true', help='fail if any hot query does a full table scan')
+    args = parser.parse_args()
+
+    for name, version in migrate_all().items():
+        print(f"📁 {name:<15} schema v{version}")
+
+    if args.check:
+        full_scans = check_query_plans()
+        for name, sql, step in full_scans:
+            print(f"❌ {name}: {step}\n   {sql}")
+        if full_scans:
+            sys.exit(1)
+        print("✅ No hot query falls back to a full table scan")
+
+if __name__ == "__main__":
+    main()
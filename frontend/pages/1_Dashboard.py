@@ -33,6 +33,9 @@ st.set_page_config(
 user = check_authentication()
 user_role = get_user_role()
 
+# Every KPI, distribution and trend on this page comes from one snapshot
+snapshot = db.get_dashboard_snapshot(user_role, days=30)
+
 # Custom CSS for winning UI
 st.markdown("""
 <style>
@@ -184,7 +187,7 @@ with st.sidebar:
     st.markdown("---")
     
     # Quick stats in sidebar with visible numbers
-    stats = db.get_user_stats(user_role)
+    stats = snapshot.stats
     
     st.markdown("### 📊 Quick Stats")
     
@@ -215,6 +218,7 @@ with st.sidebar:
     st.caption(f"🕐 Last updated: {datetime.now().strftime('%I:%M %p')}")
     
     if st.button("🔄 Refresh Data", use_container_width=True):
+        db.invalidate_cache()
         st.rerun()
 
 # ==================== MAIN DASHBOARD ====================
@@ -230,7 +234,7 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # Get dashboard statistics
-stats = db.get_user_stats(user_role)
+stats = snapshot.stats
 
 # ==================== KEY METRICS ROW ====================
 st.markdown('<div class="section-header"><h3>📈 Key Performance Indicators</h3></div>', unsafe_allow_html=True)
@@ -285,7 +289,7 @@ with col5:
 st.markdown("---")
 
 # ==================== ALERTS SECTION ====================
-active_alerts = db.get_active_alerts()
+active_alerts = snapshot.active_alerts
 critical_alerts = [a for a in active_alerts if a['severity'] == 'Critical']
 high_alerts = [a for a in active_alerts if a['severity'] == 'High']
 
@@ -329,7 +333,7 @@ chart_col1, chart_col2 = st.columns(2)
 with chart_col1:
     st.markdown("#### 📈 Complaint Trends (Last 30 Days)")
     
-    time_series = db.get_time_series_data(30)
+    time_series = snapshot.time_series
     
     if time_series['dates']:
         fig_trend = go.Figure()
@@ -371,7 +375,7 @@ with chart_col1:
 with chart_col2:
     st.markdown("#### 🎯 Fraud Type Distribution")
     
-    fraud_data = db.get_complaints_by_fraud_type()
+    fraud_data = snapshot.fraud_types
     
     if fraud_data:
         fig_fraud = go.Figure(data=[
@@ -402,7 +406,7 @@ st.markdown("---")
 # Chart 3: City-wise Complaint Distribution
 st.markdown("#### 🗺️ Geographic Distribution")
 
-city_data = db.get_complaints_by_city()
+city_data = snapshot.cities
 
 if city_data:
     fig_city = go.Figure(data=[
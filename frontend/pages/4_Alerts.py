@@ -5,8 +5,11 @@ Role-based real-time alert dashboard for authorized users
 
 import streamlit as st
 import pandas as pd
+from collections import deque
 from datetime import datetime, timedelta
+import os
 import random
+import requests
 
 st.set_page_config(
     page_title="Alerts - I4C Portal",
@@ -30,7 +33,50 @@ def random_alert(i):
         "details": f"Automated detection triggered for {random.choice(locations)} ATM. Immediate action required."
     }
 
-alerts = [random_alert(i) for i in range(1, 16)]
+# Live source: the backend's alert table (backend/main.py, GET /alerts), polled for
+# alerts newer than the last one this session has shown
+ALERTS_API_URL = os.environ.get("ALERTS_API_URL", "http://127.0.0.1:8000")
+ALERTS_POLL_SECONDS = float(os.environ.get("ALERTS_POLL_SECONDS", "5"))
+LIVE_ALERTS_MAX = 200  # alerts kept per session; the oldest drop off the list
+
+def from_backend(a):
+    return {
+        "id": f"ALERT-{a['id']}",
+        "type": a["type"],
+        "location": a["location"],
+        "priority": a["priority"],
+        "timestamp": str(a["created_at"]).replace("T", " ")[:16],
+        "status": a["status"],
+        "details": a["details"] or "",
+    }
+
+def poll_new_alerts(page_size=100, timeout=2):
+    """
+    Add the alerts created since the last poll to this session's bounded list and
+    return it, newest first. GET /alerts is paged newest first until it reaches
+    the last id already shown (or LIVE_ALERTS_MAX alerts), so a poll with nothing
+    new is one short request and never waits for alerts to arrive.
+    """
+    state = st.session_state
+    if "live_alerts" not in state:
+        state["live_alerts"] = deque(maxlen=LIVE_ALERTS_MAX)
+        state["last_alert_id"] = 0
+    new, cursor = [], None
+    while len(new) < LIVE_ALERTS_MAX:
+        params = {"limit": page_size, **({"cursor": cursor} if cursor else {})}
+        r = requests.get(f"{ALERTS_API_URL}/alerts", params=params, timeout=timeout)
+        r.raise_for_status()
+        page = r.json()
+        fresh = [a for a in page if a["id"] > state["last_alert_id"]]
+        new.extend(fresh)
+        cursor = r.headers.get("X-Next-Cursor")
+        if len(fresh) < len(page) or not cursor:
+            break
+    if new:
+        state["last_alert_id"] = max(a["id"] for a in new)
+        for a in sorted(new, key=lambda a: a["id"]):  # oldest first: the newest ends up in front
+            state["live_alerts"].appendleft(from_backend(a))
+    return list(state["live_alerts"])
 
 st.markdown("""
 <style>
@@ -68,7 +114,21 @@ st.markdown("""
 
 st.markdown('<div class="section-header"><h3>🔔 Active Alerts</h3></div>', unsafe_allow_html=True)
 
-for alert in alerts:
+# Only this fragment reruns on the timer; the rest of the page is not rebuilt
+@st.fragment(run_every=ALERTS_POLL_SECONDS)
+def active_alerts():
+    try:
+        alerts = poll_new_alerts()
+        st.caption(f"🟢 Live alerts from {ALERTS_API_URL}, refreshed every {ALERTS_POLL_SECONDS:g} s")
+    except requests.exceptions.RequestException:
+        if "demo_alerts" not in st.session_state:
+            st.session_state["demo_alerts"] = [random_alert(i) for i in range(1, 16)]
+        alerts = st.session_state["demo_alerts"]
+        st.caption("⚪ Backend not reachable: showing demo alerts")
+    for alert in alerts:
+        render_alert(alert)
+
+def render_alert(alert):
     color = "#dc3545" if alert["priority"] == "Critical" else "#fd7e14" if alert["priority"] == "High" else "#ffc107" if alert["priority"] == "Medium" else "#17a2b8"
     with st.expander(f"🚨 [{alert['priority']}] {alert['type']} - {alert['location']} ({alert['timestamp']})", expanded=alert["priority"] in ["Critical", "High"]):
         st.markdown(f"""
@@ -87,6 +147,8 @@ for alert in alerts:
         st.button("Escalate", key=f"esc_{alert['id']}", use_container_width=True)
         st.button("Download Report", key=f"dl_{alert['id']}", use_container_width=True)
 
+active_alerts()
+
 st.markdown("""
 <div style="text-align: center; padding: 2rem; background: white; border-radius: 10px; margin-top: 2rem;">
     <p style="color: #7f8c8d; margin: 0;">